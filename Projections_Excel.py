@@ -1,8 +1,17 @@
-import yfinance as yf
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
+import price_store
+import timing
+from data_cache import CachedTicker
+from projection import HISTORY_YEARS, PROJECTION_YEARS, project_growth, price_targets
+from providers import get_provider
 
-def get_financials(ticker):
-    stock = yf.Ticker(ticker)
+def get_financials(ticker, provider=None):
+    stock = CachedTicker(ticker, provider)
     financials = stock.financials.T
     try:
         revenue = financials['Total Revenue'].dropna() / 1e9
@@ -11,16 +20,11 @@ def get_financials(ticker):
     except KeyError:
         return pd.Series(), pd.Series(), None
 
-def project_growth(values, growth_rate, years=4):
-    if len(values) == 0:
-        return []
-    last = values[-1]
-    return [last := last * (1 + growth_rate) for _ in range(years)]
-
 def get_historical_prices(stock, start_year, end_year):
-    hist = stock.history(start=f"{start_year}-01-01", end=f"{end_year}-12-31")
-    return hist['Close'].resample('YE').last()
+    # Year-end closes served from the local price store; only missing days are downloaded
+    return price_store.year_end_closes(stock.ticker, start_year, end_year, provider=stock.provider)
 
+@timing.timed("export.excel")
 def export_to_excel(ticker, revenue, net_income, projections, price_hist, price_proj, current_price, shares_out, eps):
     file_name = f"{ticker}_financial_projection.xlsx"
     with pd.ExcelWriter(file_name, engine='xlsxwriter') as writer:
@@ -33,7 +37,7 @@ def export_to_excel(ticker, revenue, net_income, projections, price_hist, price_
         df_hist.to_excel(writer, sheet_name="Financials")
 
         # Sheet 2: Projections
-        years_proj = [revenue.index[-1] + i for i in range(1, 5)]
+        years_proj = [revenue.index[-1].year + i for i in range(1, len(projections["rev_proj"]) + 1)]
         df_proj = pd.DataFrame({
             "Projected Revenue (B)": projections["rev_proj"],
             "Projected Net Income (B)": projections["ni_proj"],
@@ -59,11 +63,151 @@ def export_to_excel(ticker, revenue, net_income, projections, price_hist, price_
 
     print(f"\n✅ Exported all data to '{file_name}'")
 
-def main_excel():
+PROJECTION_COLUMNS = ["Year", "Revenue (B)", "Net Income (B)", "Price Low", "Price High"]
+SUMMARY_COLUMNS = ["Rank", "Ticker", "Current Price", "Price Low (Yr N)", "Price High (Yr N)",
+                   "Upside Low", "Upside High", "Upside Mid"]
+# Each constant-memory sheet keeps a temp file open until the workbook closes;
+# past this many tickers export_bulk writes the long format instead (macOS
+# allows 256 open files by default)
+MAX_SHEETS = int(os.environ.get("FINANCE_EXCEL_MAX_SHEETS", "200"))
+
+
+def _sheet_name(ticker, used):
+    # Excel sheet names: max 31 chars, no []:*?/\ and unique (case-insensitive)
+    name = re.sub(r"[\[\]:*?/\\]", "_", ticker)[:31] or "Sheet"
+    base, n = name, 1
+    while name.lower() in used:
+        suffix = f"~{n}"
+        name = base[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(name.lower())
+    return name
+
+
+def _projection_rows(result):
+    yield [result["last_year"], result["revenue"], result["net_income"], None, None]
+    for i, row in enumerate(zip(result["rev_proj"], result["ni_proj"],
+                                result["price_low"], result["price_high"]), start=1):
+        yield [result["last_year"] + i, *row]
+
+
+@timing.timed("export.bulk")
+def export_bulk(entries, file_name="watchlist_financial_projection.xlsx", long_format=False,
+                workers=8, history_years=HISTORY_YEARS, projection_years=PROJECTION_YEARS, provider=None):
+    """Project many tickers into one workbook with xlsxwriter's constant-memory mode.
+
+    entries are (ticker, assumptions) pairs as produced by batch.read_watchlist.
+    Each finished ticker is written straight to its own sheet (or appended to a
+    single long-format 'Projections' sheet) and dropped, so only the one-row
+    summary per ticker stays in memory. More than MAX_SHEETS tickers always
+    use the long format. The 'Summary' sheet ranks tickers by year-N upside
+    versus the current price. Returns the failures as [(ticker, error), ...].
+    """
+    import xlsxwriter
+    from Projections_Console import project_ticker
+
+    entries = list(entries)
+    if not long_format and len(entries) > MAX_SHEETS:
+        print(f"⚠️ {len(entries)} tickers is more than {MAX_SHEETS} sheets (one open file each): "
+              "writing one long-format 'Projections' sheet instead")
+        long_format = True
+
+    workbook = xlsxwriter.Workbook(file_name, {"constant_memory": True})
+    bold = workbook.add_format({"bold": True})
+    money = workbook.add_format({"num_format": "#,##0.00"})
+    pct = workbook.add_format({"num_format": "0.0%"})
+
+    summary_sheet = workbook.add_worksheet("Summary")  # first tab, filled in last
+    used_names = {"summary"}
+    long_sheet = None
+    long_row = 1
+    if long_format:
+        long_sheet = workbook.add_worksheet("Projections")
+        used_names.add("projections")
+        long_sheet.write_row(0, 0, ["Ticker"] + PROJECTION_COLUMNS, bold)
+
+    summary = []
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(timing.wrap(project_ticker), ticker, history_years=history_years,
+                        projection_years=projection_years, provider=provider, **assumptions): ticker
+            for ticker, assumptions in entries
+        }
+        for future in as_completed(futures):
+            ticker = futures.pop(future)  # drop the result once written
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append((ticker, str(e)))
+                continue
+
+            if long_sheet is not None:
+                for year, *values in _projection_rows(result):
+                    # Ticker and Year stay unformatted; only the amounts get the money format
+                    long_sheet.write_row(long_row, 0, [ticker, year])
+                    long_sheet.write_row(long_row, 2, values, money)
+                    long_row += 1
+            else:
+                sheet = workbook.add_worksheet(_sheet_name(ticker, used_names))
+                sheet.write_row(0, 0, ["Shares Outstanding (B)", "EPS (TTM)", "Current Price"], bold)
+                sheet.write_row(1, 0, [result["shares_outstanding"], result["eps_ttm"], result["current_price"]], money)
+                sheet.write_row(3, 0, PROJECTION_COLUMNS, bold)
+                for r, (year, *values) in enumerate(_projection_rows(result), start=4):
+                    sheet.write(r, 0, year)
+                    sheet.write_row(r, 1, values, money)
+
+            price = result["current_price"]
+            low, high = result["price_low"][-1], result["price_high"][-1]
+            upside_low = low / price - 1 if price else None
+            upside_high = high / price - 1 if price else None
+            upside_mid = (upside_low + upside_high) / 2 if price else None
+            summary.append((ticker, price, low, high, upside_low, upside_high, upside_mid))
+
+    # Best upside first; tickers without a quote go last
+    summary.sort(key=lambda row: (row[-1] is None, -(row[-1] or 0)))
+    summary_sheet.write_row(0, 0, SUMMARY_COLUMNS, bold)
+    for rank, (ticker, price, low, high, *upsides) in enumerate(summary, start=1):
+        summary_sheet.write_row(rank, 0, [rank, ticker])
+        summary_sheet.write_row(rank, 2, [price, low, high], money)
+        summary_sheet.write_row(rank, 5, upsides, pct)
+    summary_sheet.set_column(0, len(SUMMARY_COLUMNS) - 1, 16)
+
+    workbook.close()
+    print(f"\n✅ Exported {len(summary)} tickers to '{file_name}' ({len(failures)} failed)")
+    return failures
+
+
+def main_bulk(argv=None):
+    import argparse
+    from batch import ASSUMPTIONS, DEFAULTS, read_watchlist
+
+    parser = argparse.ArgumentParser(description="Export projections for a whole watchlist into one workbook.")
+    parser.add_argument("--bulk", required=True, metavar="WATCHLIST",
+                        help="CSV with a 'ticker' column and optional rev_growth, ni_growth, pe_low, pe_high; or one ticker per line")
+    parser.add_argument("--output", default="watchlist_financial_projection.xlsx")
+    parser.add_argument("--long", action="store_true", help="One long-format 'Projections' sheet instead of one sheet per ticker")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--projection-years", type=int, default=PROJECTION_YEARS)
+    parser.add_argument("--provider", help="yahoo, record[:DIR] or replay[:DIR] (default: $FINANCE_PROVIDER or yahoo)")
+    for key in ASSUMPTIONS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=float, default=DEFAULTS[key])
+    args = parser.parse_args(argv)
+
+    invalid = []
+    entries = read_watchlist(args.bulk, {key: getattr(args, key) for key in ASSUMPTIONS}, invalid)
+    failures = export_bulk(entries, args.output, long_format=args.long, workers=args.workers,
+                           projection_years=args.projection_years, provider=get_provider(args.provider))
+    for ticker, error in [(ticker, str(e)) for ticker, e in invalid] + failures:
+        print(f"⚠️ {ticker}: {error}")
+    timing.report()
+
+
+def main_excel(history_years=HISTORY_YEARS, projection_years=PROJECTION_YEARS, provider=None):
     ticker = input("Enter stock ticker (e.g., AAPL): ").upper()
-    revenue, net_income, stock = get_financials(ticker)
-    revenue = revenue.tail(4)
-    net_income = net_income.tail(4)
+    revenue, net_income, stock = get_financials(ticker, provider)
+    revenue = revenue.tail(history_years)
+    net_income = net_income.tail(history_years)
 
     if len(revenue) < 1 or len(net_income) < 1:
         print("⚠️ Not enough data to run projection.")
@@ -88,11 +232,11 @@ def main_excel():
 
     shares_out_bil = shares_out / 1e9
 
-    rev_proj = project_growth(revenue.values, rev_growth, 4)
-    ni_proj = project_growth(net_income.values, ni_growth, 4)
+    rev_proj = project_growth(revenue.values, rev_growth, projection_years)
+    ni_proj = project_growth(net_income.values, ni_growth, projection_years)
 
-    price_low = [(ni / shares_out_bil) * pe_low for ni in ni_proj]
-    price_high = [(ni / shares_out_bil) * pe_high for ni in ni_proj]
+    price_low = price_targets(ni_proj, shares_out_bil, pe_low).tolist()
+    price_high = price_targets(ni_proj, shares_out_bil, pe_high).tolist()
 
     start_year = revenue.index[0].year
     end_year = revenue.index[-1].year
@@ -121,4 +265,9 @@ def main_excel():
     )
 
 if __name__ == "__main__":
-    main_excel()
+    if len(sys.argv) > 1:
+        main_bulk()
+    else:
+        with timing.run("excel"):
+            main_excel()
+        timing.report()
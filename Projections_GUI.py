@@ -1,240 +1,259 @@
-import yfinance as yf
-import pandas as pd
+import queue
+import threading
+
 import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import messagebox
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import charts
+import timing
+from projection import HISTORY_YEARS, PROJECTION_YEARS, project_growth, price_targets
+from snapshot import load_snapshot
+
+DEBOUNCE_MS = 150  # coalesce slider events into one redraw
+POLL_MS = 16       # ~60 fps check for finished background loads
+
+
+class SnapshotWorker(threading.Thread):
+    """Loads ticker snapshots off the Tk thread and keeps them in memory.
+
+    Requests carry a generation number; when several pile up while a fetch
+    is running, only the newest one is served.
+    """
+
+    def __init__(self, provider=None):
+        super().__init__(daemon=True)
+        self.provider = provider
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    def cached(self, ticker):
+        with self.lock:
+            return self.snapshots.get(ticker)
+
+    def request(self, ticker, generation):
+        self.requests.put((ticker, generation))
+
+    def run(self):
+        while True:
+            ticker, generation = self.requests.get()
+            while True:
+                try:
+                    ticker, generation = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+
+            snapshot, error = self.cached(ticker), None
+            if snapshot is None:
+                try:
+                    # Financials (billions), info and price history, fetched concurrently
+                    snapshot = load_snapshot(ticker, provider=self.provider)
+                except Exception as e:
+                    error = e
+                else:
+                    with self.lock:
+                        self.snapshots[ticker] = snapshot
+            self.results.put((ticker, generation, snapshot, error))
+
+
+generation = 0          # bumped on every input change; older results are stale
+pending_update = None   # Tk after() id of the debounced update
+
+
+def schedule_update(event=None):
+    global pending_update
+    if pending_update is not None:
+        root.after_cancel(pending_update)
+    pending_update = root.after(DEBOUNCE_MS, update_chart)
 
-def get_financials(ticker):
-    stock = yf.Ticker(ticker)
-    financials = stock.financials.T
-    try:
-        revenue = financials['Total Revenue'].dropna() / 1e9
-        net_income = financials['Net Income'].dropna() / 1e9
-        return revenue, net_income, stock
-    except KeyError:
-        messagebox.showwarning("Data Warning", f"Missing 'Total Revenue' or 'Net Income' for {ticker}.")
-        return pd.Series(), pd.Series(), None
-
-def project_growth(values, growth_rate, years=4):
-    if len(values) == 0:
-        return []
-    last = values[-1]
-    projections = []
-    for _ in range(years):
-        last *= (1 + growth_rate)
-        projections.append(last)
-    return projections
-
-def get_historical_prices(stock, start_year, end_year):
-    start_date = f"{start_year}-01-01"
-    end_date = f"{end_year}-12-31"
-    hist = stock.history(start=start_date, end=end_date)
-    yearly = hist['Close'].resample('YE').last()
-    yearly.index = yearly.index.year.astype(str)
-    return yearly
 
 def update_chart(event=None):
+    global generation, pending_update
+    pending_update = None
     ticker = ticker_entry.get().upper()
     if not ticker:
         return
 
-    # Get financials: revenue and net income in billions, plus the stock object
-    revenue, net_income, stock = get_financials(ticker)
-    # Sort oldest to newest and take last 4 years
-    revenue = revenue.sort_index().tail(4)
-    net_income = net_income.sort_index().tail(4)
-
-    # If no data, clear plots and exit
+    generation += 1
+    snapshot = worker.cached(ticker)
+    if snapshot is not None:
+        draw_chart(ticker, snapshot)
+    else:
+        status_var.set(f"⏳ Loading {ticker}...")
+        worker.request(ticker, generation)
+
+
+def poll_results():
+    while True:
+        try:
+            ticker, result_generation, snapshot, error = worker.results.get_nowait()
+        except queue.Empty:
+            break
+        if result_generation != generation:
+            continue  # inputs changed while loading; a newer request is on its way
+        if error is not None:
+            status_var.set("")
+            messagebox.showwarning("Data Warning", f"Could not load {ticker}: {error}")
+        else:
+            draw_chart(ticker, snapshot)
+    root.after(POLL_MS, poll_results)
+
+
+class ChartController:
+    """Owns the chart artists for one ticker and updates them in place.
+
+    setup() draws a ticker's chart spec once: history, current-quote points,
+    axes and legend are static, while the input-dependent series and %
+    annotations are animated artists. update() moves only those with
+    set_data and blits them over the cached background. A full redraw happens
+    only on a ticker change or when the projection no longer fits the
+    y-limits.
+    """
+
+    def __init__(self, fig, ax1, ax2, canvas):
+        self.fig, self.ax1, self.ax2, self.canvas = fig, ax1, ax2, canvas
+        self.ticker = None
+        self.snapshot = None
+        self.base = None
+        self.artists = {}
+        self.background = None
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def clear(self):
+        self.ticker = self.snapshot = self.base = None
+        self.artists = {}
+        self.ax1.clear()
+        self.ax2.clear()
+        self.canvas.draw()
+
+    def _on_draw(self, event):
+        # Any full draw (relayout, window resize) refreshes the blit background
+        with timing.span("render.background", ticker=self.ticker):
+            self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+            for artist in self.artists.values():
+                artist.axes.draw_artist(artist)
+
+    def setup(self, ticker, snapshot, base, spec):
+        self.ticker, self.snapshot, self.base = ticker, snapshot, base
+        self.ax1.clear()
+        self.ax2.clear()
+        with timing.span("render.setup", ticker=ticker):
+            artists = charts.draw(spec, (self.ax1, self.ax2), annotate=False, animated=True)
+        self.artists = {key: artist for key, artist in artists.items() if artist.get_animated()}
+        # Fixed x range: slider changes never move it, only the y-limits
+        for ax in (self.ax1, self.ax2):
+            ax.set_xlim(-0.4, len(spec.x_labels) - 0.6)
+        self.background = None  # first update does the full layout
+
+    def update(self, spec):
+        with timing.span("render.update", ticker=self.ticker) as span:
+            charts.update(spec, self.artists)
+
+            if self._rescale(force=self.background is None):
+                # Relayout: the draw_event handler recaptures the background
+                span.set(mode="relayout")
+                self.canvas.draw_idle()
+                return
+
+            span.set(mode="blit")
+            self.canvas.restore_region(self.background)
+            for artist in self.artists.values():
+                artist.axes.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+
+    def _rescale(self, force=False):
+        """Autoscale y; keep the old limits unless forced or the data left them or shrank a lot."""
+        changed = False
+        for ax in (self.ax1, self.ax2):
+            old_lo, old_hi = ax.get_ylim()
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+            new_lo, new_hi = ax.get_ylim()
+            if force or new_lo < old_lo or new_hi > old_hi or (new_hi - new_lo) < 0.5 * (old_hi - old_lo):
+                # Headroom so the next few slider steps still blit
+                pad = 0.1 * (new_hi - new_lo)
+                ax.set_ylim(new_lo - pad, new_hi + pad, auto=None)
+                changed = True
+            else:
+                ax.set_ylim(old_lo, old_hi, auto=None)
+        return changed
+
+
+def prepare_base(ticker, snapshot):
+    """Static (input-independent) chart data for a ticker, or None with a warning."""
+    if not snapshot.has_financials:
+        messagebox.showwarning("Data Warning", f"Missing 'Total Revenue' or 'Net Income' for {ticker}.")
+    # Sort oldest to newest and take last N years
+    revenue = snapshot.revenue.tail(HISTORY_YEARS)
+    net_income = snapshot.net_income.tail(HISTORY_YEARS)
     if len(revenue) < 1 or len(net_income) < 1:
-        ax1.clear()
-        ax2.clear()
-        canvas.draw()
-        return
-
-    # Growth rates and P/E estimates from sliders (convert % to decimal)
-    rev_growth = rev_growth_scale.get() / 100
-    ni_growth = ni_growth_scale.get() / 100
-    pe_low = pe_low_scale.get()
-    pe_high = pe_high_scale.get()
+        return None
 
-    # Retrieve shares outstanding from stock info; warn if missing
-    shares_outstanding = stock.info.get("sharesOutstanding", None)
+    # Shares outstanding (billions) from the snapshot's info; warn if missing
+    shares_outstanding = snapshot.shares_outstanding
     if shares_outstanding is None:
         messagebox.showwarning("Data Warning", "Could not retrieve shares outstanding.")
-        return
-    shares_outstanding = shares_outstanding / 1e9  # Convert to billions
+        return None
 
-    # Get trailing EPS and current price if available to include current estimates
-    eps_ttm = stock.info.get('trailingEps', None)
-    current_price = stock.info.get('currentPrice', None)
-    insert_current = (eps_ttm is not None and current_price is not None)
-
-    # Extract years from financials index for historical data
+    # Extract years from financials index and the matching year-end prices
     hist_years = revenue.index.year.astype(int).tolist()
-    last_year = hist_years[-1]
-    proj_years = [last_year + i for i in range(1, 5)]  # Next 4 years
-
-    # Convert series values to lists for easier manipulation
-    rev_list = list(revenue.values)
-    ni_list = list(net_income.values)
-
-    # Get historical stock prices for those years
-    price_hist = get_historical_prices(stock, hist_years[0], last_year)
-    price_hist_list = [price_hist.get(str(y), None) for y in hist_years]
-
-    if insert_current:
-        # Define a half-year index to plot current estimated values
-        current_year = last_year + 0.5
-
-        # Calculate current net income from EPS and shares outstanding
-        ni_current = eps_ttm * shares_outstanding
+    price_hist = snapshot.yearly_prices(hist_years[0], hist_years[-1])
 
+    # Current estimates need both trailing EPS and a quote
+    eps_ttm = snapshot.eps_ttm
+    current_price = snapshot.current_price
+    current = None
+    if eps_ttm is not None and current_price is not None:
         # Estimate current revenue using recent growth if possible
         if len(revenue) >= 2:
             recent_rev_growth = (revenue.values[-1] - revenue.values[-2]) / revenue.values[-2]
             rev_current = revenue.values[-1] * (1 + recent_rev_growth)
         else:
             rev_current = revenue.values[-1]
+        current = (float(rev_current), eps_ttm * shares_outstanding, current_price)
 
-        # Project future price lows and highs using P/E and projected net income
-        price_low_proj = [(ni / shares_outstanding) * pe_low for ni in project_growth([ni_current], ni_growth, years=4)]
-        price_high_proj = [(ni / shares_outstanding) * pe_high for ni in project_growth([ni_current], ni_growth, years=4)]
-
-        # Price estimates for current EPS times P/E bounds
-        price_low_current = eps_ttm * pe_low
-        price_high_current = eps_ttm * pe_high
+    return {
+        "hist_years": hist_years,
+        "rev_list": [float(v) for v in revenue.values],
+        "ni_list": [float(v) for v in net_income.values],
+        "price_hist_list": [price_hist.get(str(y), None) for y in hist_years],
+        "shares_outstanding": shares_outstanding,
+        "current": current,
+    }
 
-        # Combine all years for plotting: historical + current + projected
-        all_years = hist_years + [current_year] + proj_years
-        rev_combined = rev_list + [rev_current] + project_growth([rev_current], rev_growth, years=4)
-        ni_combined = ni_list + [ni_current] + project_growth([ni_current], ni_growth, years=4)
 
-        price_low = [None]*len(hist_years) + [price_low_current] + price_low_proj
-        price_high = [None]*len(hist_years) + [price_high_current] + price_high_proj
-        price_hist_extended = price_hist_list + [current_price] + [None]*len(proj_years)
-
-    else:
-        # If no current data, project from historical values only
-        all_years = hist_years + proj_years
-        rev_combined = rev_list + project_growth(rev_list, rev_growth, years=4)
-        ni_combined = ni_list + project_growth(ni_list, ni_growth, years=4)
-
-        price_low_proj = [(ni / shares_outstanding) * pe_low for ni in project_growth(ni_list, ni_growth, years=4)]
-        price_high_proj = [(ni / shares_outstanding) * pe_high for ni in project_growth(ni_list, ni_growth, years=4)]
-        price_low = [None]*len(hist_years) + price_low_proj
-        price_high = [None]*len(hist_years) + price_high_proj
-        price_hist_extended = price_hist_list + [None]*len(proj_years)
-
-    # Create readable labels: years or year + 0.5 for current estimate
-    all_years_labels = [str(y) if int(y) == y else f"{int(y)}.5" for y in all_years]
-
-    # Clear previous plots
-    ax1.clear()
-    ax2.clear()
-
-    # X-axis indices for historical, current and projected points
-    x_vals = list(range(len(all_years)))
-    x_hist = list(range(len(hist_years)))
-    x_current = [len(hist_years)] if insert_current else []
-    x_proj = list(range(len(hist_years) + (1 if insert_current else 0), len(all_years)))
-
-    # Plot historical revenue and net income with markers
-    ax1.plot(x_hist, rev_combined[:len(hist_years)], label="Revenue (Historical)", marker='o', color='tab:blue')
-    ax1.plot(x_hist, ni_combined[:len(hist_years)], label="Net Income (Historical)", marker='o', color='tab:orange')
-
-    # --- Draw connection lines for current revenue and net income ---
-    if insert_current:
-        x_prev = x_hist[-1]
-        x_curr = x_current[0]
-        x_next = x_proj[0]
-
-        # Revenue connections: solid from last historical to current, dotted from current to projection start
-        y_rev_prev = rev_combined[x_prev]
-        y_rev_curr = rev_combined[x_curr]
-        y_rev_next = rev_combined[x_next]
-        ax1.plot([x_prev, x_curr], [y_rev_prev, y_rev_curr], linestyle='-', color='tab:blue', linewidth=1.5)
-        ax1.plot([x_curr, x_next], [y_rev_curr, y_rev_next], linestyle=':', color='tab:blue', linewidth=1.5)
-
-        # Net income connections: same style
-        y_ni_prev = ni_combined[x_prev]
-        y_ni_curr = ni_combined[x_curr]
-        y_ni_next = ni_combined[x_next]
-        ax1.plot([x_prev, x_curr], [y_ni_prev, y_ni_curr], linestyle='-', color='tab:orange', linewidth=1.5)
-        ax1.plot([x_curr, x_next], [y_ni_curr, y_ni_next], linestyle=':', color='tab:orange', linewidth=1.5)
-
-        # Plot markers for current estimates with dotted lines
-        ax1.plot(x_current, [rev_combined[len(hist_years)]], label="Revenue (Current, est.)", marker='o', linestyle=':', color='tab:blue')
-        ax1.plot(x_current, [ni_combined[len(hist_years)]], label="Net Income (Current, est.)", marker='o', linestyle=':', color='tab:orange')
-
-    # Plot projected revenue and net income with dashed lines
-    ax1.plot(x_proj, rev_combined[-len(proj_years):], label="Revenue (Projected)", marker='o', linestyle='--', color='tab:blue')
-    ax1.plot(x_proj, ni_combined[-len(proj_years):], label="Net Income (Projected)", marker='o', linestyle='--', color='tab:orange')
-
-    ax1.set_ylabel("Billions USD")
-    ax1.set_title(f"{ticker} – Financials: 4-Year History + Current + 4-Year Projection")
-    ax1.grid(True)
-    ax1.legend()
-
-    # Plot historical prices
-    ax2.plot(x_hist, price_hist_extended[:len(hist_years)], label="Historical Price", marker='o', color='blue')
-
-    # Plot current price marker if available
-    if insert_current:
-        ax2.plot(x_current, [price_hist_extended[len(hist_years)]], label="Current Price (Quote)", marker='o', color='purple')
-
-    # Plot price estimate ranges with different markers and line styles
-    ax2.plot(x_proj, price_low[-len(proj_years):], label="Price Low Estimate", marker='x', linestyle='-.', color='red')
-    ax2.plot(x_proj, price_high[-len(proj_years):], label="Price High Estimate", marker='x', linestyle='-.', color='green')
-
-    ax2.set_ylabel("Stock Price (USD)")
-    ax2.set_title(f"{ticker} – Stock Price: Historical, Current & Projected")
-    ax2.grid(True)
-    ax2.legend()
-
-    plt.xticks(ticks=x_vals, labels=all_years_labels)
-
-    # Helper function to plot connection lines for price estimates if points exist
-    def plot_price_conn(x1, x2, y1, y2, style, color):
-        if y1 is not None and y2 is not None:
-            ax2.plot([x1, x2], [y1, y2], linestyle=style, color=color, linewidth=1.5)
-
-    # Draw connections from historical price to current price and current to projections
-    if insert_current:
-        # Connect last historical price to current price
-        plot_price_conn(x_hist[-1], x_current[0], price_hist_extended[len(hist_years)-1], price_hist_extended[len(hist_years)], ':', 'purple')
-
-        # Connect current price to first projected price low and high
-        if price_low[-len(proj_years)] is not None:
-            plot_price_conn(x_current[0], x_proj[0], price_hist_extended[len(hist_years)], price_low[-len(proj_years)], ':', 'red')
-        if price_high[-len(proj_years)] is not None:
-            plot_price_conn(x_current[0], x_proj[0], price_hist_extended[len(hist_years)], price_high[-len(proj_years)], ':', 'green')
-
-        # --- Annotations for % change between current and first projected high/low ---
-        first_proj_high = price_high[-len(proj_years)]
-        first_proj_low = price_low[-len(proj_years)]
-        current_price_val = price_hist_extended[len(hist_years)]
-
-        if first_proj_high is not None and current_price_val is not None:
-            pct_change_high = ((first_proj_high - current_price_val) / current_price_val) * 100
-            ax2.annotate(f"{pct_change_high:+.1f}%", 
-                         xy=(x_proj[0], first_proj_high), 
-                         xytext=(x_proj[0]-0.4, first_proj_high),
-                         color='green',
-                         fontsize=10,
-                         arrowprops=dict(arrowstyle="->", color='green'))
-
-        if first_proj_low is not None and current_price_val is not None:
-            pct_change_low = ((first_proj_low - current_price_val) / current_price_val) * 100
-            ax2.annotate(f"{pct_change_low:+.1f}%", 
-                         xy=(x_proj[0], first_proj_low), 
-                         xytext=(x_proj[0]-0.4, first_proj_low),
-                         color='red',
-                         fontsize=10,
-                         arrowprops=dict(arrowstyle="->", color='red'))
-
-    plt.tight_layout()
-    canvas.draw()
+def build_spec(ticker, base):
+    # Growth rates and P/E estimates from sliders (convert % to decimal)
+    rev_growth = rev_growth_scale.get() / 100
+    ni_growth = ni_growth_scale.get() / 100
+    current = base["current"]
+
+    # Project from the current estimates when there are any, else the last historical year
+    rev_start = current[0] if current else base["rev_list"][-1]
+    ni_start = current[1] if current else base["ni_list"][-1]
+    rev_proj = project_growth([rev_start], rev_growth, years=PROJECTION_YEARS)
+    ni_proj = project_growth([ni_start], ni_growth, years=PROJECTION_YEARS)
+    price_low_proj = price_targets(ni_proj, base["shares_outstanding"], pe_low_scale.get()).tolist()
+    price_high_proj = price_targets(ni_proj, base["shares_outstanding"], pe_high_scale.get()).tolist()
+
+    return charts.projection_chart(ticker, base["hist_years"], base["rev_list"], base["ni_list"],
+                                   base["price_hist_list"], current, rev_proj, ni_proj,
+                                   price_low_proj, price_high_proj)
+
+
+def draw_chart(ticker, snapshot):
+    status_var.set("")
+    if chart.ticker != ticker or chart.snapshot is not snapshot:
+        base = prepare_base(ticker, snapshot)
+        if base is None:
+            chart.clear()
+            return
+        chart.setup(ticker, snapshot, base, build_spec(ticker, base))
+    with timing.span("compute.project", ticker=ticker):
+        spec = build_spec(ticker, chart.base)
+    chart.update(spec)
 
 
 root = tk.Tk()
@@ -251,22 +270,22 @@ ticker_entry.grid(row=0, column=1, columnspan=3, sticky="we", padx=5, pady=5)
 ticker_entry.bind("<Return>", update_chart)
 
 tk.Label(root, text="Revenue Growth Rate (%)").grid(row=1, column=0, padx=5, pady=5)
-rev_growth_scale = tk.Scale(root, from_=0, to=100, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: update_chart())
+rev_growth_scale = tk.Scale(root, from_=0, to=100, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: schedule_update())
 rev_growth_scale.set(8)
 rev_growth_scale.grid(row=1, column=1, padx=5, pady=5)
 
 tk.Label(root, text="Net Income Growth Rate (%)").grid(row=1, column=2, padx=5, pady=5)
-ni_growth_scale = tk.Scale(root, from_=0, to=100, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: update_chart())
+ni_growth_scale = tk.Scale(root, from_=0, to=100, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: schedule_update())
 ni_growth_scale.set(8)
 ni_growth_scale.grid(row=1, column=3, padx=5, pady=5)
 
 tk.Label(root, text="Low P/E Estimate").grid(row=2, column=0, padx=5, pady=5)
-pe_low_scale = tk.Scale(root, from_=1, to=800, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: update_chart())
+pe_low_scale = tk.Scale(root, from_=1, to=800, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: schedule_update())
 pe_low_scale.set(10)
 pe_low_scale.grid(row=2, column=1, padx=5, pady=5)
 
 tk.Label(root, text="High P/E Estimate").grid(row=2, column=2, padx=5, pady=5)
-pe_high_scale = tk.Scale(root, from_=1, to=800, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: update_chart())
+pe_high_scale = tk.Scale(root, from_=1, to=800, resolution=0.1, orient=tk.HORIZONTAL, command=lambda x: schedule_update())
 pe_high_scale.set(25)
 pe_high_scale.grid(row=2, column=3, padx=5, pady=5)
 
@@ -274,11 +293,19 @@ pe_high_scale.grid(row=2, column=3, padx=5, pady=5)
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), constrained_layout=True)
 canvas = FigureCanvasTkAgg(fig, master=root)
 canvas.get_tk_widget().grid(row=3, column=0, columnspan=4, sticky="nsew")
+chart = ChartController(fig, ax1, ax2, canvas)
+
+status_var = tk.StringVar()
+tk.Label(root, textvariable=status_var, anchor="w").grid(row=4, column=0, columnspan=4, sticky="we", padx=5)
 
 # Make the grid expand properly
 root.grid_rowconfigure(3, weight=1)
 root.grid_columnconfigure((0,1,2,3), weight=1)
 
+worker = SnapshotWorker()
+worker.start()
+poll_results()
 update_chart()
 
 root.mainloop()
+timing.report()
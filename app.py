@@ -1,37 +1,196 @@
+import io
+import time
+
 import streamlit as st
-import yfinance as yf
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import TwoSlopeNorm
+from charts import projection_chart, to_altair, tornado
+from monte_carlo import simulate
+from quotes import QUOTE_INTERVAL, shared_poller
+from projection import HISTORY_YEARS, PROJECTION_YEARS, implied_growth, project_growth, price_targets, scenario_grid
+from sensitivity import INPUTS, LABELS, bumps
+from snapshot import load_snapshot
+from ttm import load_ttm
+import timing
+
+FETCH_TTL = 15 * 60  # seconds; the on-disk cache underneath keeps its own TTLs
+
+
+# Pipeline stages: fetch -> normalize -> project -> price targets -> render.
+# Each stage is memoized on its own inputs, so moving one slider only reruns
+# the stages downstream of it.
+
+@st.cache_data(ttl=FETCH_TTL, show_spinner="Fetching financials, quote and price history...")
+@timing.timed("app.fetch")
+def fetch_stage(ticker):
+    # financials, info and prices are fetched concurrently into one snapshot
+    return load_snapshot(ticker)
+
+@st.cache_data(ttl=FETCH_TTL, show_spinner="Fetching quarterly statements...")
+@timing.timed("app.ttm")
+def ttm_stage(ticker):
+    # Rolling four-quarter window; the cache underneath only fetches new quarters
+    return load_ttm(ticker)
+
+@st.cache_data
+@timing.timed("app.normalize")
+def normalize_stage(revenue, net_income, info, history_years=HISTORY_YEARS):
+    revenue = revenue.sort_index().tail(history_years)
+    net_income = net_income.sort_index().tail(history_years)
+
+    shares_outstanding = info.get("sharesOutstanding", None)
+    if shares_outstanding is not None:
+        shares_outstanding = shares_outstanding / 1e9  # to billions
+
+    eps_ttm = info.get('trailingEps', None)
+    current_price = info.get('currentPrice', None)
+
+    if len(revenue) >= 2:
+        recent_rev_growth = (revenue.values[-1] - revenue.values[-2]) / revenue.values[-2]
+        rev_current = revenue.values[-1] * (1 + recent_rev_growth)
+    elif len(revenue) == 1:
+        rev_current = revenue.values[-1]
+    else:
+        rev_current = None
+
+    return {
+        "revenue": revenue,
+        "net_income": net_income,
+        "hist_years": revenue.index.year.astype(int).tolist(),
+        "shares_outstanding": shares_outstanding,
+        "eps_ttm": eps_ttm,
+        "current_price": current_price,
+        "rev_current": rev_current,
+    }
+
+@st.cache_data
+@timing.timed("app.project")
+def project_stage(values, growth_rate, years=PROJECTION_YEARS):
+    return project_growth(list(values), growth_rate, years=years)
+
+@st.cache_data
+@timing.timed("app.price_targets")
+def price_target_stage(ni_proj, shares_outstanding, eps_ttm, pe):
+    price_proj = price_targets(ni_proj, shares_outstanding, pe).tolist()
+    price_current = eps_ttm * pe if eps_ttm is not None else None
+    return price_current, price_proj
+
+@st.cache_data(max_entries=16, show_spinner="Simulating paths...")
+@timing.timed("app.monte_carlo")
+def monte_carlo_stage(rev_start, ni_start, shares_outstanding, rev_growth, ni_growth, growth_std,
+                      pe_low, pe_high, years, n_paths, seed):
+    return simulate(rev_start, ni_start, shares_outstanding, rev_growth, ni_growth, growth_std,
+                    pe_low, pe_high, years=years, n_paths=n_paths, seed=seed)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+@timing.timed("app.chart_spec")
+def chart_stage(ticker, hist_years, rev_list, ni_list, price_hist_list, current,
+                rev_proj, ni_proj, price_low, price_high, bands=None, current_label=None):
+    # current is None or (rev_current, ni_current, current_price);
+    # bands is None or monte_carlo.simulate() output (5/25/50/75/95 rows)
+    return projection_chart(ticker, hist_years, rev_list, ni_list, price_hist_list, current,
+                            rev_proj, ni_proj, price_low[1], price_high[1], bands, current_label)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+@timing.timed("app.scenario_grid")
+def scenario_grid_stage(ticker, ni_last, shares_outstanding, current_price,
+                        growth_range, pe_range, resolution, years):
+    growth_rates = np.linspace(*growth_range, resolution)
+    pe_values = np.linspace(*pe_range, resolution)
+
+    start = time.perf_counter()
+    targets, upside = scenario_grid(ni_last, shares_outstanding, growth_rates, pe_values,
+                                    years=years, current_price=current_price)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    extent = [pe_range[0], pe_range[1], growth_range[0] * 100, growth_range[1] * 100]
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    im1 = ax1.imshow(targets, origin='lower', extent=extent, aspect='auto', cmap='viridis')
+    fig.colorbar(im1, ax=ax1, label="Price Target (USD)")
+    ax1.set_title(f"{ticker} – Year-{years} Price Target")
+
+    if np.isnan(upside).all():
+        ax2.text(0.5, 0.5, "No current price quote", ha='center', va='center', transform=ax2.transAxes)
+    else:
+        upside_pct = upside * 100
+        vmin, vmax = np.nanmin(upside_pct), np.nanmax(upside_pct)
+        norm = TwoSlopeNorm(vcenter=0, vmin=min(vmin, -1e-9), vmax=max(vmax, 1e-9))
+        im2 = ax2.imshow(upside_pct, origin='lower', extent=extent, aspect='auto', cmap='RdYlGn', norm=norm)
+        fig.colorbar(im2, ax=ax2, label="Implied Upside (%)")
+        if vmin < 0 < vmax:
+            ax2.contour(upside_pct, levels=[0], colors='black', linewidths=1,
+                        extent=extent, origin='lower')
+    ax2.set_title(f"{ticker} – Implied Upside vs Current Price")
+
+    for ax in (ax1, ax2):
+        ax.set_xlabel("P/E Multiple")
+        ax.set_ylabel("Net Income Growth Rate (%)")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue(), elapsed_ms
+
+
+@st.fragment(run_every=QUOTE_INTERVAL)
+def live_projection(ticker, hist_years, rev_list, ni_list, price_hist_list, current,
+                    rev_proj, ni_proj, price_low, price_high, bands=None, current_label=None):
+    # Reruns on its own every quote tick: only the quote metric and the chart's
+    # current-price point move, the fetch/normalize/projection stages don't rerun
+    if current is not None:
+        quote = shared_poller().get(ticker, current[2])
+        if quote is not None:
+            st.metric("🔎 Current Stock Price Quote", f"${quote.price:.2f}", f"{quote.change:+.2f}")
+            current = (current[0], current[1], quote.price)
+    spec = chart_stage(ticker, hist_years, rev_list, ni_list, price_hist_list, current,
+                       rev_proj, ni_proj, price_low, price_high, bands, current_label)
+    with timing.span("render.chart", ticker=ticker):
+        st.altair_chart(to_altair(spec), width="stretch")
+
+
+def sensitivity_view(ticker, ni_last, ni_growth, shares_outstanding, pe, bump, years):
+    # Closed-form: all four inputs in one pass, no re-projection per slider
+    start = time.perf_counter()
+    with timing.span("compute.sensitivity", ticker=ticker):
+        result = bumps(ni_last, ni_growth, shares_outstanding, pe, bump, years)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    labels = [LABELS[key] for key in INPUTS]
+    price = float(result["price"])
+    st.altair_chart(tornado(labels, price, result["low"], result["high"],
+                            f"{ticker} – Year-{years} Price Target at P/E {pe:.1f} (${price:,.2f}), each input ±{bump:.0%}"),
+                    width="stretch")
+    st.dataframe({
+        "Input": labels,
+        "Elasticity": result["elasticity"].round(3),
+        f"Price at −{bump:.0%}": result["low"].round(2),
+        f"Price at +{bump:.0%}": result["high"].round(2),
+    }, hide_index=True)
+    st.caption(f"⏱️ Elasticities and ±{bump:.0%} bumps computed in {elapsed_ms:.3f} ms "
+               "(elasticity = % change in price per 1% change in the input)")
+
+
+def scenario_grid_view(ticker, data, projection_years):
+    shares_outstanding = data["shares_outstanding"]
+    if shares_outstanding is None:
+        st.warning("⚠️ Could not retrieve shares outstanding from Yahoo Finance.")
+        return
 
-def get_financials(ticker):
-    stock = yf.Ticker(ticker)
-    financials = stock.financials.T  # years as rows
-    try:
-        revenue = financials['Total Revenue'].dropna() / 1e9  # billions
-        net_income = financials['Net Income'].dropna() / 1e9
-        return revenue, net_income, stock
-    except KeyError:
-        print(f"\n⚠️ Missing 'Total Revenue' or 'Net Income' for {ticker}.")
-        return pd.Series(), pd.Series(), None
-
-def project_growth(values, growth_rate, years=4):
-    if len(values) == 0:
-        return []
-    last = values[-1]
-    projections = []
-    for _ in range(years):
-        last *= (1 + growth_rate)
-        projections.append(last)
-    return projections
-
-def get_historical_prices(stock, start_year, end_year):
-    start_date = f"{start_year}-01-01"
-    end_date = f"{end_year}-12-31"
-    hist = stock.history(start=start_date, end=end_date)
-    # Resample to get yearly closing price at year-end (adjusted close)
-    yearly = hist['Close'].resample('YE').last()
-    yearly.index = yearly.index.year.astype(str)
-    return yearly
+    col1, col2 = st.columns(2)
+    with col1:
+        growth_range = st.slider("Net Income Growth Range", min_value=-0.5, max_value=1.0, value=(0.0, 0.3), step=0.005, format="%.3f")
+    with col2:
+        pe_range = st.slider("P/E Range", min_value=1.0, max_value=200.0, value=(10.0, 40.0), step=1.0)
+    resolution = st.select_slider("Grid Resolution (points per axis)", options=[25, 50, 100, 200, 400], value=200)
+
+    png, elapsed_ms = scenario_grid_stage(ticker, float(data["net_income"].values[-1]), shares_outstanding,
+                                          data["current_price"], growth_range, pe_range, resolution, projection_years)
+    st.caption(f"⏱️ {resolution}×{resolution} scenarios computed in {elapsed_ms:.2f} ms")
+    with timing.span("render.scenario_grid", ticker=ticker):
+        st.image(png, width="stretch")
 
 
 def main():
@@ -42,20 +201,28 @@ def main():
         st.info("Please enter a ticker symbol to continue.")
         return
 
-    revenue, net_income, stock = get_financials(ticker)
+    snapshot = fetch_stage(ticker)
 
-    if revenue.empty or net_income.empty:
+    if not snapshot.has_financials:
         st.warning("⚠️ Not enough financial data to run projection.")
         return
 
-    revenue = revenue.sort_index().tail(4)
-    net_income = net_income.sort_index().tail(4)
+    data = normalize_stage(snapshot.revenue, snapshot.net_income, snapshot.info)
+    revenue = data["revenue"]
+    net_income = data["net_income"]
 
-    st.write("### Last 4 Years of Revenue (Billions):", revenue)
-    st.write("### Last 4 Years of Net Income (Billions):", net_income)
+    st.write(f"### Last {len(revenue)} Years of Revenue (Billions):", revenue)
+    st.write(f"### Last {len(net_income)} Years of Net Income (Billions):", net_income)
 
     st.markdown("### 🔧 Projection Inputs")
 
+    projection_years = st.slider("Projection Horizon (years)", min_value=1, max_value=30, value=PROJECTION_YEARS)
+
+    mode = st.radio("Mode", ["Single Projection", "Scenario Grid"], horizontal=True)
+    if mode == "Scenario Grid":
+        scenario_grid_view(ticker, data, projection_years)
+        return
+
     st.markdown("**Estimated Annual Revenue Growth Rate (%)**")
     rev_growth_slider = st.slider("Revenue Growth Slider", min_value=0.0, max_value=1.0, value=0.08, step=0.005, format="%.3f")
     rev_growth_input = st.number_input("Or manually enter revenue growth rate", value=rev_growth_slider, step=0.005, format="%.4f")
@@ -76,225 +243,95 @@ def main():
     pe_high_input = st.number_input("Or manually enter High P/E", value=pe_high_slider, step=0.5)
     pe_high = pe_high_input
 
+    use_ttm = st.toggle("📅 Start from the trailing twelve months (quarterly statements) instead of the last fiscal year")
+
+    with st.expander("🎲 Monte Carlo Bands"):
+        use_monte_carlo = st.checkbox("Overlay percentile bands (5/25/50/75/95)")
+        growth_std = st.number_input("Growth rate std. dev. (per year)", min_value=0.0, value=0.05, step=0.01, format="%.3f")
+        n_paths = st.select_slider("Simulated paths", options=[10_000, 50_000, 100_000, 250_000, 1_000_000], value=100_000)
+        seed = st.number_input("Random seed", min_value=0, value=0, step=1)
+
+    # Keep the projection on screen once it has been run so slider tweaks
+    # update it directly instead of waiting for another button press.
     if st.button("Run Projection"):
-        shares_outstanding = stock.info.get("sharesOutstanding", None)
-        if shares_outstanding is None:
-            st.warning("⚠️ Could not retrieve shares outstanding from Yahoo Finance.")
-            return
-        shares_outstanding = shares_outstanding / 1e9  # to billions
-        st.write(f"🧾 Shares Outstanding (from Yahoo): {shares_outstanding:.2f} billion")
-
-        eps_ttm = stock.info.get('trailingEps', None)
-        current_price = stock.info.get('currentPrice', None)
-        if eps_ttm is None or current_price is None:
-            st.warning("⚠️ Could not retrieve current EPS TTM or current stock price quote.")
-            insert_current = False
-        else:
-            insert_current = True
+        st.session_state["projection_ticker"] = ticker
+    if st.session_state.get("projection_ticker") != ticker:
+        return
+
+    shares_outstanding = data["shares_outstanding"]
+    if shares_outstanding is None:
+        st.warning("⚠️ Could not retrieve shares outstanding from Yahoo Finance.")
+        return
+    st.write(f"🧾 Shares Outstanding (from Yahoo): {shares_outstanding:.2f} billion")
+
+    ttm = ttm_stage(ticker) if use_ttm else None
+    if ttm is not None and not ttm.ready:
+        st.warning("⚠️ Fewer than four consecutive quarters reported: starting from the last fiscal year.")
+        ttm = None
+    elif ttm is not None:
+        st.write(f"📅 TTM to {ttm.period_end:%Y-%m-%d}: revenue {ttm.revenue:.2f}B, net income {ttm.net_income:.2f}B")
+
+    eps_ttm = data["eps_ttm"]
+    current_price = data["current_price"]
+    if (eps_ttm is None and ttm is None) or current_price is None:
+        st.warning("⚠️ Could not retrieve current EPS TTM or current stock price quote.")
+        insert_current = False
+    else:
+        insert_current = True
+        if eps_ttm is not None:
             st.write(f"🔎 Current EPS (TTM): {eps_ttm:.4f}")
-            st.write(f"🔎 Current Stock Price Quote: ${current_price:.2f}")
-
-        rev_proj = project_growth(revenue.values, rev_growth, years=4)
-        ni_proj = project_growth(net_income.values, ni_growth, years=4)
-
-        hist_years = revenue.index.year.astype(int).tolist()
-        last_year = hist_years[-1]
-        proj_years = [last_year + i for i in range(1, 5)]
-
-        rev_list = list(revenue.values)
-        ni_list = list(net_income.values)
-
-        price_hist = get_historical_prices(stock, hist_years[0], last_year)
-        price_hist_list = [price_hist.get(str(y), None) for y in hist_years]
-
-        if insert_current:
-            current_year = last_year + 0.5
-            ni_current = eps_ttm * shares_outstanding
-            if len(revenue) >= 2:
-                recent_rev_growth = (revenue.values[-1] - revenue.values[-2]) / revenue.values[-2]
-                rev_current = revenue.values[-1] * (1 + recent_rev_growth)
-            else:
-                rev_current = revenue.values[-1]
-
-            price_low_proj = [(ni / shares_outstanding) * pe_low for ni in ni_proj]
-            price_high_proj = [(ni / shares_outstanding) * pe_high for ni in ni_proj]
-
-            price_low_current = eps_ttm * pe_low
-            price_high_current = eps_ttm * pe_high
-
-            all_years = hist_years + [current_year] + proj_years
-            rev_combined = rev_list + [rev_current] + rev_proj
-            ni_combined = ni_list + [ni_current] + ni_proj
-
-            price_low = [None]*len(hist_years) + [price_low_current] + price_low_proj
-            price_high = [None]*len(hist_years) + [price_high_current] + price_high_proj
-            price_hist_extended = price_hist_list + [current_price] + [None]*len(proj_years)
-        else:
-            all_years = hist_years + proj_years
-            rev_combined = rev_list + rev_proj
-            ni_combined = ni_list + ni_proj
-
-            price_low_proj = [(ni / shares_outstanding) * pe_low for ni in ni_proj]
-            price_high_proj = [(ni / shares_outstanding) * pe_high for ni in ni_proj]
-            price_low = [None]*len(hist_years) + price_low_proj
-            price_high = [None]*len(hist_years) + price_high_proj
-            price_hist_extended = price_hist_list + [None]*len(proj_years)
-
-        all_years_labels = [str(y) if int(y) == y else f"{int(y)}.5" for y in all_years]
-
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), sharex=True)
-
-        x_vals = list(range(len(all_years)))
-        x_hist = list(range(len(hist_years)))
-        x_current = [len(hist_years)] if insert_current else []
-        x_proj = list(range(len(hist_years) + (1 if insert_current else 0), len(all_years)))
-
-        ax1.plot(x_hist, rev_combined[:len(hist_years)], label="Revenue (Historical)", marker='o', color='tab:blue')
-        ax1.plot(x_hist, ni_combined[:len(hist_years)], label="Net Income (Historical)", marker='o', color='tab:orange')
-
-        if insert_current:
-            x_prev = x_hist[-1]
-            x_curr = x_current[0]
-            x_next = x_proj[0]
-
-            # Revenue connections
-            y_rev_prev = rev_combined[x_prev]
-            y_rev_curr = rev_combined[x_curr]
-            y_rev_next = rev_combined[x_next]
-            ax1.plot([x_prev, x_curr], [y_rev_prev, y_rev_curr], linestyle='-', color='tab:blue', linewidth=1.5)
-            ax1.plot([x_curr, x_next], [y_rev_curr, y_rev_next], linestyle=':', color='tab:blue', linewidth=1.5)
-
-            # Net income connections
-            y_ni_prev = ni_combined[x_prev]
-            y_ni_curr = ni_combined[x_curr]
-            y_ni_next = ni_combined[x_next]
-            ax1.plot([x_prev, x_curr], [y_ni_prev, y_ni_curr], linestyle='-', color='tab:orange', linewidth=1.5)
-            ax1.plot([x_curr, x_next], [y_ni_curr, y_ni_next], linestyle=':', color='tab:orange', linewidth=1.5)
-
-        if insert_current:
-            ax1.plot(x_current, [rev_combined[len(hist_years)]], label="Revenue (Current, est.)", marker='o', linestyle=':', color='tab:blue')
-            ax1.plot(x_current, [ni_combined[len(hist_years)]], label="Net Income (Current, est.)", marker='o', linestyle=':', color='tab:orange')
-
-        ax1.plot(x_proj, rev_combined[-len(proj_years):], label="Revenue (Projected)", marker='o', linestyle='--', color='tab:blue')
-        ax1.plot(x_proj, ni_combined[-len(proj_years):], label="Net Income (Projected)", marker='o', linestyle='--', color='tab:orange')
-
-        ax1.set_ylabel("Billions USD")
-        ax1.set_title(f"{ticker} – Financials: 4-Year History + Current + 4-Year Projection")
-        ax1.grid(True)
-        ax1.legend()
-
-        ax2.plot(x_hist, price_hist_extended[:len(hist_years)], label="Historical Price", marker='o', color='blue')
-        if insert_current:
-            ax2.plot(x_current, [price_hist_extended[len(hist_years)]], label="Current Price (Quote)", marker='o', color='purple')
-        ax2.plot(x_proj, price_low[-len(proj_years):], label="Price Low Estimate", marker='x', linestyle='-.', color='red')
-        ax2.plot(x_proj, price_high[-len(proj_years):], label="Price High Estimate", marker='x', linestyle='-.', color='green')
-
-        ax2.set_ylabel("Stock Price (USD)")
-        ax2.set_title(f"{ticker} – Stock Price: Historical, Current & Projected")
-        ax2.grid(True)
-        ax2.legend()
-
-        plt.xticks(ticks=x_vals, labels=all_years_labels)
-
-        def plot_price_conn(x1, y1, x2, y2):
-            if y1 is not None and y2 is not None:
-                ax2.plot([x1, x2], [y1, y2], linestyle=':', color='gray')
-
-        for i in range(len(hist_years)-1):
-            plot_price_conn(x_hist[i], price_hist_extended[i], x_hist[i+1], price_hist_extended[i+1])
-        if insert_current:
-            plot_price_conn(x_hist[-1], price_hist_extended[len(hist_years)-1], x_current[0], price_hist_extended[len(hist_years)])
-            plot_price_conn(x_current[0], price_hist_extended[len(hist_years)], x_proj[0], None)
-        for i in range(len(proj_years)-1):
-            plot_price_conn(x_proj[i], price_low[-len(proj_years)+i], x_proj[i+1], price_low[-len(proj_years)+i+1])
-            plot_price_conn(x_proj[i], price_high[-len(proj_years)+i], x_proj[i+1], price_high[-len(proj_years)+i+1])
-        if insert_current:
-            y_last_hist = price_hist_extended[len(hist_years)-1]
-            y_current = price_hist_extended[len(hist_years)]
-            y_low_proj0 = price_low_proj[0]
-            y_high_proj0 = price_high_proj[0]
-            plot_price_conn(x_hist[-1], y_last_hist, x_current[0], y_current)
-            plot_price_conn(x_current[0], y_current, x_proj[0], y_low_proj0)
-            plot_price_conn(x_current[0], y_current, x_proj[0], y_high_proj0)
-        else:
-            y_last_hist = price_hist_extended[len(hist_years)-1]
-            y_low_proj0 = price_low_proj[0]
-            y_high_proj0 = price_high_proj[0]
-            plot_price_conn(x_hist[-1], y_last_hist, x_proj[0], y_low_proj0)
-            plot_price_conn(x_hist[-1], y_last_hist, x_proj[0], y_high_proj0)
-
-        def annotate_prices(ax, x_vals, y_vals, color):
-            for x, y in zip(x_vals, y_vals):
-                if y is not None:
-                    ax.annotate(f"${y:.2f}", (x, y), textcoords="offset points", xytext=(0, 8),
-                                ha='center', fontsize=9, color=color)
-
-        annotate_prices(ax2, x_hist, price_hist_extended[:len(hist_years)], 'blue')
-        if insert_current:
-            annotate_prices(ax2, x_current, [price_hist_extended[len(hist_years)]], 'purple')
-        annotate_prices(ax2, x_proj, price_low[-len(proj_years):], 'red')
-        annotate_prices(ax2, x_proj, price_high[-len(proj_years):], 'green')
-
-        def annotate_proj_change(ax, x_start, y_start, x_end, y_end, color, label):
-            if y_start is None or y_end is None:
-                return
-            pct_change = (y_end - y_start) / y_start * 100
-            x_mid = (x_start + x_end) / 2
-            y_mid = (y_start + y_end) / 2
-            offset_y = 30 if color == 'green' else -40
-            ax.annotate(f"{label}\n{pct_change:+.1f}%",
-                xy=(x_mid, y_mid),
-                xytext=(0, offset_y),
-                textcoords='offset points',
-                ha='center',
-                fontsize=9,
-                color=color,
-                arrowprops=dict(arrowstyle='->', color=color, lw=1))
-
-        if insert_current:
-            x_current_idx = len(hist_years)
-            x_first_proj_idx = len(hist_years) + 1
-            y_current_price = price_hist_extended[x_current_idx]
-            y_low_first_proj = price_low_proj[0]
-            y_high_first_proj = price_high_proj[0]
-            annotate_proj_change(ax2, x_current_idx, y_current_price,
-                                 x_first_proj_idx, y_low_first_proj, 'red', "Low Price")
-            annotate_proj_change(ax2, x_current_idx, y_current_price,
-                                 x_first_proj_idx, y_high_first_proj, 'green', "High Price")
-        else:
-            x_last_hist_idx = len(hist_years) - 1
-            x_first_proj_idx = len(hist_years)
-            y_last_hist_price = price_hist_extended[x_last_hist_idx]
-            y_low_first_proj = price_low_proj[0]
-            y_high_first_proj = price_high_proj[0]
-            annotate_proj_change(ax2, x_last_hist_idx, y_last_hist_price,
-                                 x_first_proj_idx, y_low_first_proj, 'red', "Low Price")
-            annotate_proj_change(ax2, x_last_hist_idx, y_last_hist_price,
-                                 x_first_proj_idx, y_high_first_proj, 'green', "High Price")
-
-        def scale_ylim(ax):
-            ymin, ymax = ax.get_ylim()
-            ax.set_ylim(ymin, ymax * 1.15)
-
-        scale_ylim(ax1)
-        scale_ylim(ax2)
-
-        # 🔼 Add annotations for Revenue and Net Income
-        def annotate_financials(ax, x_vals, y_vals, color, prefix=""):
-            for x, y in zip(x_vals, y_vals):
-                if y is not None:
-                    ax.annotate(f"{prefix}{y:.2f}", (x, y),
-                                textcoords="offset points", xytext=(0, 8),
-                                ha='center', fontsize=9, color=color)
-
-        annotate_financials(ax1, x_hist, rev_combined[:len(hist_years)], 'tab:blue', prefix="$")
-        annotate_financials(ax1, x_hist, ni_combined[:len(hist_years)], 'tab:orange', prefix="$")
-        if insert_current:
-            annotate_financials(ax1, x_current, [rev_combined[len(hist_years)]], 'tab:blue', prefix="$")
-            annotate_financials(ax1, x_current, [ni_combined[len(hist_years)]], 'tab:orange', prefix="$")
-        annotate_financials(ax1, x_proj, rev_combined[-len(proj_years):], 'tab:blue', prefix="$")
-        annotate_financials(ax1, x_proj, ni_combined[-len(proj_years):], 'tab:orange', prefix="$")    
-        st.pyplot(fig)
+
+    rev_list = [float(v) for v in revenue.values]
+    ni_list = [float(v) for v in net_income.values]
+    # Projections compound from the last fiscal year, or from the TTM values
+    rev_start = rev_list if ttm is None else [ttm.revenue]
+    ni_start = ni_list if ttm is None else [ttm.net_income]
+
+    rev_proj = project_stage(rev_start, rev_growth, years=projection_years)
+    ni_proj = project_stage(ni_start, ni_growth, years=projection_years)
+
+    price_low = price_target_stage(ni_proj, shares_outstanding, eps_ttm, pe_low)
+    price_high = price_target_stage(ni_proj, shares_outstanding, eps_ttm, pe_high)
+
+    hist_years = data["hist_years"]
+    price_hist = snapshot.yearly_prices(hist_years[0], hist_years[-1])
+    price_hist_list = [price_hist.get(str(y), None) for y in hist_years]
+
+    current = None
+    if insert_current and ttm is not None:
+        current = (ttm.revenue, ttm.net_income, current_price)
+    elif insert_current:
+        current = (float(data["rev_current"]), eps_ttm * shares_outstanding, current_price)
+
+    bands = None
+    if use_monte_carlo:
+        bands = monte_carlo_stage(rev_start[-1], ni_start[-1], shares_outstanding, rev_growth, ni_growth, growth_std,
+                                  pe_low, pe_high, projection_years, n_paths, int(seed))
+
+    live_projection(ticker, hist_years, rev_list, ni_list, price_hist_list, current,
+                    rev_proj, ni_proj, price_low, price_high, bands, ttm.label if ttm is not None else None)
+
+    if current_price is not None:
+        # Reverse projection: the growth that makes each year-N target equal today's price
+        pe_values = [pe_low, pe_high]
+        st.dataframe({
+            "Exit P/E": pe_values,
+            f"Year-{projection_years} Price Target": [price_low[1][-1], price_high[1][-1]],
+            "Your NI Growth": [ni_growth] * 2,
+            "Implied NI Growth (at today's price)": implied_growth(current_price, ni_start[-1], shares_outstanding,
+                                                                   pe_values, projection_years),
+        }, hide_index=True, column_config={
+            f"Year-{projection_years} Price Target": st.column_config.NumberColumn(format="$%.2f"),
+            "Your NI Growth": st.column_config.NumberColumn(format="percent"),
+            "Implied NI Growth (at today's price)": st.column_config.NumberColumn(format="percent"),
+        })
+
+    with st.expander("🌪️ Sensitivity of the Year-N Price Target"):
+        bump = st.slider("Bump each input by (±%)", min_value=1, max_value=50, value=10) / 100
+        sensitivity_view(ticker, ni_start[-1], ni_growth, shares_outstanding, (pe_low + pe_high) / 2, bump,
+                         projection_years)
 
 if __name__ == "__main__":
-    main()
+    with timing.run("app"):
+        main()
+    timing.panel()
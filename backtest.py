@@ -0,0 +1,141 @@
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import price_store
+import timing
+from data_cache import CachedTicker
+from projection import PROJECTION_YEARS
+from snapshot import normalize_financials
+
+# Backtest of the growth x P/E band. For every ticker and origin year, project
+# net income from that fiscal year's statement (and, for trailing growth, the
+# years before it), then check the year-end close `horizon` years later
+# against the low/high price band. The panel is (tickers, years) arrays and
+# every ticker x year x horizon is scored in one broadcast, no per-ticker loop.
+# Fiscal year y is filed a few months after it ends, so even the 1-year
+# horizon is scored on a price from after the data was public. Caveat: Yahoo
+# only reports today's shares outstanding, so per-share targets use it for
+# every year (later buybacks and dilution leak into the past).
+
+
+def trailing_growth(net_income, lookback=3):
+    """Net income CAGR over the `lookback` years up to each year, (tickers, years); NaN unless both ends > 0."""
+    net_income = np.asarray(net_income, dtype=float)
+    past = np.full_like(net_income, np.nan)
+    past[:, lookback:] = net_income[:, :-lookback]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.power(net_income / past, 1 / lookback) - 1
+    return np.where((past > 0) & (net_income > 0), growth, np.nan)
+
+
+def run(net_income, prices, shares_outstanding, growth=0.08, pe_low=10.0, pe_high=20.0, horizons=PROJECTION_YEARS):
+    """Project every (ticker, origin year) and line it up with the realized year-end price.
+
+    net_income (billions) and prices are (tickers, years) arrays over the same
+    consecutive years, NaN where missing; shares_outstanding (billions) is
+    (tickers,). growth is one rate or a (tickers, years) array such as
+    trailing_growth(). horizons is N (for 1..N years) or a list of horizons.
+    Returns (tickers, years, horizons) arrays low, high and realized, plus
+    valid: a band and a realized price exist and net income was positive
+    (a P/E multiple says nothing about a loss).
+    """
+    net_income = np.asarray(net_income, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    shares = np.asarray(shares_outstanding, dtype=float)
+    horizons = np.arange(1, horizons + 1) if np.ndim(horizons) == 0 else np.asarray(horizons, dtype=int)
+    growth = np.broadcast_to(np.asarray(growth, dtype=float), net_income.shape)
+
+    # realized[t, y, h] = prices[t, y + h], NaN beyond the last year of the panel
+    padded = np.concatenate([prices, np.full((len(prices), horizons.max()), np.nan)], axis=1)
+    realized = padded[:, np.arange(prices.shape[1])[:, None] + horizons]
+
+    eps = net_income[..., None] * np.power(1 + growth[..., None], horizons) / shares[:, None, None]
+    low, high = eps * min(pe_low, pe_high), eps * max(pe_low, pe_high)
+    valid = np.isfinite(low) & np.isfinite(high) & (realized > 0) & (net_income > 0)[..., None]
+    return {"low": low, "high": high, "realized": realized, "valid": valid, "horizons": horizons}
+
+
+def summary(result, years=None, by="horizon"):
+    """Hit rates and errors per horizon (by="horizon") or per origin year (by="year").
+
+    hit_rate     realized price inside [low, high]
+    above_rate   realized above high (the band was too pessimistic)
+    below_rate   realized below low
+    bias         median log(realized / band midpoint); > 0 means prices beat the band
+    median_abs_error  median |midpoint / realized - 1|, midpoint = sqrt(low * high)
+    """
+    valid = result["valid"]
+    low, high, realized = result["low"], result["high"], result["realized"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mid = np.sqrt(low * high)
+        cells = {
+            "hit_rate": (realized >= low) & (realized <= high),
+            "above_rate": realized > high,
+            "below_rate": realized < low,
+            "bias": np.log(realized / mid),
+            "median_abs_error": np.abs(mid / realized - 1),
+        }
+    axes = (0, 1) if by == "horizon" else (0, 2)
+    count = valid.sum(axis=axes)
+    frame = pd.DataFrame({"n": count})
+    for name, values in cells.items():
+        values = np.where(valid, values, np.nan)
+        reduce = np.nanmean if name.endswith("_rate") else np.nanmedian
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices (nothing scored) stay NaN
+            frame[name] = reduce(values.astype(float), axis=axes)
+    if by == "horizon":
+        frame.insert(0, "horizon", result["horizons"])
+    else:
+        frame.insert(0, "origin_year", years if years is not None else np.arange(len(frame)))
+    return frame
+
+
+def _ticker_history(ticker, start_year, end_year, provider):
+    # Net income (billions), year-end closes and shares (billions) for one ticker; raises ValueError if any is missing
+    stock = CachedTicker(ticker, provider)
+    _, net_income = normalize_financials(stock.financials)
+    if net_income.empty:
+        raise ValueError("missing 'Net Income'")
+    shares = stock.info.get("sharesOutstanding")
+    if not shares:
+        raise ValueError("shares outstanding unavailable")
+    closes = price_store.year_end_closes(stock.ticker, start_year, end_year, provider=stock.provider).dropna()
+    if closes.empty:
+        raise ValueError("no year-end prices")
+    return net_income, closes, shares / 1e9
+
+
+def _load_entry(ticker, start_year, end_year, provider):
+    # Pool worker: errors come back as values so one bad ticker doesn't stop the backtest
+    try:
+        return ticker, _ticker_history(ticker, start_year, end_year, provider), None
+    except Exception as e:
+        return ticker, None, f"{type(e).__name__}: {e}"
+
+
+def load_panel(tickers, start_year, end_year, provider=None, workers=8):
+    """(tickers, years, net_income, prices, shares) arrays from the cache / provider, plus failures.
+
+    Net income is keyed by the calendar year its fiscal year ends in, prices
+    are year-end closes from the price store. Tickers that can't be loaded are
+    left out and returned as failures, [(ticker, error), ...]. Yahoo's
+    statements only go back about four years, so longer backtests need
+    recorded fixtures.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        entries = list(pool.map(timing.wrap(lambda t: _load_entry(t, start_year, end_year, provider)), tickers))
+    loaded = {ticker: history for ticker, history, error in entries if error is None}
+    failures = [(ticker, error) for ticker, _, error in entries if error is not None]
+
+    years = np.arange(start_year, end_year + 1)
+    names = list(loaded)
+    net_income = pd.DataFrame({t: h[0].groupby(h[0].index.year).last() for t, h in loaded.items()},
+                              index=years, columns=names)
+    prices = pd.DataFrame({t: h[1].groupby(h[1].index.year).last() for t, h in loaded.items()},
+                          index=years, columns=names)
+    shares = np.array([loaded[t][2] for t in names], dtype=float)
+    return names, years, net_income.to_numpy(dtype=float).T, prices.to_numpy(dtype=float).T, shares, failures
@@ -0,0 +1,237 @@
+import argparse
+import csv
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from projection import HISTORY_YEARS, PROJECTION_YEARS, implied_growth
+from providers import get_provider
+import timing
+
+ASSUMPTIONS = ("rev_growth", "ni_growth", "pe_low", "pe_high")
+DEFAULTS = {"rev_growth": 0.08, "ni_growth": 0.08, "pe_low": 10.0, "pe_high": 20.0}
+
+
+class RateLimiter:
+    """Spaces calls at least 1/max_per_second apart across all worker threads."""
+
+    def __init__(self, max_per_second=None):
+        self.interval = 1.0 / max_per_second if max_per_second else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def read_watchlist(path, defaults=DEFAULTS, invalid=None):
+    """Read tickers plus optional per-ticker assumptions.
+
+    Accepts a CSV with a 'ticker' column and any of rev_growth, ni_growth,
+    pe_low, pe_high (blank cells fall back to defaults), or a plain list
+    with one ticker per line. Rows with a cell that isn't a number are left
+    out and appended to `invalid` as (ticker, error), or printed if it's None.
+    """
+    with open(path, newline="") as f:
+        first = f.readline()
+        f.seek(0)
+        if "ticker" in first.lower():
+            rows = csv.DictReader(f)
+            rows.fieldnames = [name.strip().lower() for name in rows.fieldnames]
+            entries = []
+            for row in rows:
+                ticker = (row.get("ticker") or "").strip().upper()
+                if not ticker:
+                    continue
+                try:
+                    assumptions = {
+                        key: float(row[key]) if (row.get(key) or "").strip() else defaults[key]
+                        for key in ASSUMPTIONS
+                    }
+                except ValueError as e:
+                    if invalid is None:
+                        print(f"⚠️ {ticker}: skipped, {e}")
+                    else:
+                        invalid.append((ticker, e))
+                    continue
+                entries.append((ticker, assumptions))
+            return entries
+        return [(line.strip().upper(), dict(defaults)) for line in f
+                if line.strip() and not line.startswith("#")]
+
+
+def flatten(result, assumptions):
+    row = {
+        "ticker": result["ticker"],
+        **assumptions,
+        "last_year": result["last_year"],
+        "revenue_b": result["revenue"],
+        "net_income_b": result["net_income"],
+        "shares_outstanding_b": result["shares_outstanding"],
+        "eps_ttm": result["eps_ttm"],
+        "current_price": result["current_price"],
+    }
+    for i, (rev, ni, low, high) in enumerate(zip(result["rev_proj"], result["ni_proj"],
+                                                 result["price_low"], result["price_high"]), start=1):
+        row[f"revenue_y{i}"] = rev
+        row[f"net_income_y{i}"] = ni
+        row[f"price_low_y{i}"] = low
+        row[f"price_high_y{i}"] = high
+    price = result["current_price"]
+    row["upside_low"] = result["price_low"][-1] / price - 1 if price else None
+    row["upside_high"] = result["price_high"][-1] / price - 1 if price else None
+    # Reverse projection: the net income growth today's price already assumes at each exit P/E
+    low, high = implied_growth(price, result["net_income"], result["shares_outstanding"],
+                               [assumptions["pe_low"], assumptions["pe_high"]], len(result["ni_proj"]))
+    row["implied_growth_pe_low"] = float(low)
+    row["implied_growth_pe_high"] = float(high)
+    return row
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def write(self, row):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(row))
+            self.writer.writeheader()
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Buffers rows into small row groups so results land on disk as tickers finish."""
+
+    def __init__(self, path, row_group_size=100):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.writer = None
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.writer is None:
+            # Fixed types up front so a None in the first group can't pin a null column
+            pa = self.pa
+            schema = pa.schema([(name, pa.string() if name == "ticker" else
+                                 pa.int64() if name == "last_year" else pa.float64())
+                                for name in self.rows[0]])
+            self.writer = self.pq.ParquetWriter(self.path, schema)
+        table = self.pa.Table.from_pylist(self.rows, schema=self.writer.schema)
+        self.writer.write_table(table)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path):
+    if path.endswith(".parquet"):
+        return ParquetSink(path)
+    return CsvSink(path)
+
+
+def run_batch(entries, output, failures_path=None, workers=8, max_per_second=None,
+              history_years=HISTORY_YEARS, projection_years=PROJECTION_YEARS, progress=print, provider=None,
+              invalid=()):
+    """Project every (ticker, assumptions) entry on a bounded thread pool.
+
+    Rows are streamed to `output` (.csv or .parquet) in completion order;
+    per-ticker failures go to `failures_path` instead of being printed, as do
+    the `invalid` (ticker, error) rows read_watchlist couldn't parse.
+    Returns (succeeded, failed) counts.
+    """
+    from Projections_Console import project_ticker
+
+    failures_path = failures_path or f"{os.path.splitext(output)[0]}.failures.csv"
+    limiter = RateLimiter(max_per_second)
+
+    def work(ticker, assumptions):
+        limiter.wait()
+        result = project_ticker(ticker, history_years=history_years,
+                                projection_years=projection_years, provider=provider, **assumptions)
+        return flatten(result, assumptions)
+
+    sink = open_sink(output)
+    succeeded = failed = 0
+    with open(failures_path, "w", newline="") as failures_file, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        failures = csv.writer(failures_file)
+        failures.writerow(["ticker", "error_type", "error"])
+        for ticker, e in invalid:
+            failures.writerow([ticker, type(e).__name__, str(e)])
+            failed += 1
+        failures_file.flush()
+        futures = {pool.submit(timing.wrap(work), ticker, assumptions): ticker for ticker, assumptions in entries}
+        try:
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    sink.write(future.result())
+                    succeeded += 1
+                except Exception as e:
+                    failures.writerow([ticker, type(e).__name__, str(e)])
+                    failures_file.flush()
+                    failed += 1
+                if progress and (succeeded + failed) % 100 == 0:
+                    progress(f"… {succeeded + failed}/{len(futures)} tickers done")
+        finally:
+            sink.close()
+    return succeeded, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project every ticker in a watchlist without prompts.")
+    parser.add_argument("--batch", required=True, metavar="WATCHLIST",
+                        help="CSV with a 'ticker' column and optional rev_growth, ni_growth, pe_low, pe_high; or one ticker per line")
+    parser.add_argument("--output", default="projections.csv", help="Results file (.csv or .parquet)")
+    parser.add_argument("--failures", help="Failure report CSV (default: <output>.failures.csv)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--max-per-second", type=float, help="Cap on tickers started per second (data source rate limit)")
+    parser.add_argument("--history-years", type=int, default=HISTORY_YEARS)
+    parser.add_argument("--projection-years", type=int, default=PROJECTION_YEARS)
+    parser.add_argument("--provider", help="yahoo, record[:DIR] or replay[:DIR] (default: $FINANCE_PROVIDER or yahoo)")
+    for key in ASSUMPTIONS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=float, default=DEFAULTS[key],
+                            help=f"Default {key} when the watchlist leaves it blank (default: {DEFAULTS[key]})")
+    args = parser.parse_args(argv)
+
+    defaults = {key: getattr(args, key) for key in ASSUMPTIONS}
+    invalid = []
+    entries = read_watchlist(args.batch, defaults, invalid)
+    start = time.perf_counter()
+    with timing.run("batch"):
+        succeeded, failed = run_batch(entries, args.output, args.failures, args.workers, args.max_per_second,
+                                      args.history_years, args.projection_years, provider=get_provider(args.provider),
+                                      invalid=invalid)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {succeeded} projected, ❌ {failed} failed in {elapsed:.1f}s → '{args.output}'")
+    timing.report()
+
+
+if __name__ == "__main__":
+    main()
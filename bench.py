@@ -0,0 +1,316 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from providers import DataProvider, RecordingProvider, ReplayProvider
+
+# Stage benchmarks against replayed fixture data (no network):
+#   python bench.py run --output bench.json [--tickers 1,100,5000] [--years 4,30]
+#   python bench.py compare baseline.json bench.json [--threshold 0.1]
+# Fixtures are synthetic but go through the same record/replay providers as
+# recorded Yahoo data; pass --fixtures DIR to reuse a set between runs.
+
+STAGES = ("normalize", "projection", "render_app", "render_gui", "chart_spec",
+          "export_excel", "export_bulk", "streamlit_e2e")
+PER_TICKER = {"normalize", "projection", "export_bulk"}  # scale with ticker count
+DEFAULT_TICKERS = (1, 100)
+DEFAULT_YEARS = (4, 30)
+
+
+class SyntheticProvider(DataProvider):
+    """Deterministic per-ticker financials, info and closes (seeded from the ticker name)."""
+
+    def _rng(self, ticker, salt):
+        return np.random.default_rng(zlib.crc32(f"{ticker}:{salt}".encode()))
+
+    def financials(self, ticker):
+        rng = self._rng(ticker, "financials")
+        years = pd.to_datetime([f"{y}-12-31" for y in range(2024, 2020, -1)])
+        revenue = 1e9 * rng.uniform(1, 200) * np.cumprod(1 + rng.normal(0.08, 0.05, 4))[::-1]
+        return pd.DataFrame({"Total Revenue": revenue, "Net Income": revenue * rng.uniform(0.05, 0.3)},
+                            index=years).T
+
+    def quarterly_financials(self, ticker):
+        # Last five quarters, scaled to the last fiscal year of financials()
+        annual = self.financials(ticker).iloc[:, 0]
+        rng = self._rng(ticker, "quarterly")
+        quarters = pd.date_range("2024-03-31", "2025-03-31", freq="QE")[::-1]
+        growth = np.cumprod(1 + rng.normal(0.02, 0.03, len(quarters)))[::-1]
+        return pd.DataFrame({"Total Revenue": annual["Total Revenue"] / 4 * growth,
+                             "Net Income": annual["Net Income"] / 4 * growth}, index=quarters).T
+
+    def info(self, ticker):
+        rng = self._rng(ticker, "info")
+        eps = float(rng.uniform(0.5, 12))
+        return {"sharesOutstanding": float(rng.uniform(0.1, 10) * 1e9), "trailingEps": eps,
+                "currentPrice": eps * float(rng.uniform(8, 40)), "longName": f"{ticker} Inc",
+                "trailingPE": float(rng.uniform(8, 40))}
+
+    def history(self, ticker, start, end):
+        days = pd.bdate_range(start, end)
+        rng = self._rng(ticker, "history")
+        return pd.Series(50 * np.exp(np.cumsum(rng.normal(0, 0.015, len(days)))), index=days, name="Close")
+
+    def positions_sheet(self, url):
+        return pd.DataFrame()
+
+
+def ticker_names(n):
+    return [f"T{i:04d}" for i in range(n)]
+
+
+def make_fixtures(root, n_tickers, history_years=4):
+    """Record synthetic data for n tickers into root (skips tickers already there)."""
+    from snapshot import history_window
+    recorder = RecordingProvider(SyntheticProvider(), root)
+    start, end = history_window(history_years)
+    for ticker in ticker_names(n_tickers):
+        if os.path.exists(os.path.join(root, ticker, "history.pkl")):
+            continue
+        recorder.financials(ticker)
+        recorder.info(ticker)
+        recorder.history(ticker, start, end)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# --- stages -----------------------------------------------------------------
+# Each returns a zero-argument callable; setup (loading fixtures) is not timed.
+
+def stage_normalize(provider, tickers, years):
+    from Projections_Console import get_financials
+    return lambda: [get_financials(t, verbose=False, provider=provider) for t in tickers]
+
+
+def stage_projection(provider, tickers, years):
+    from projection import price_targets, project_paths
+    from snapshot import normalize_financials
+    last = [normalize_financials(provider.financials(t)) for t in tickers]
+    revenue = np.array([r.iloc[-1] for r, _ in last])
+    net_income = np.array([n.iloc[-1] for _, n in last])
+    shares = np.array([provider.info(t)["sharesOutstanding"] / 1e9 for t in tickers])
+
+    def run():
+        project_paths(revenue, 0.08, years)
+        ni_proj = project_paths(net_income, 0.08, years)
+        price_targets(ni_proj, shares[:, None], 10.0)
+        price_targets(ni_proj, shares[:, None], 20.0)
+    return run
+
+
+def _spec(provider, ticker, years):
+    import charts
+    from projection import price_targets, project_growth
+    from snapshot import load_snapshot
+    snapshot = load_snapshot(ticker, provider=provider)
+    revenue, net_income = snapshot.revenue.tail(4), snapshot.net_income.tail(4)
+    hist_years = revenue.index.year.astype(int).tolist()
+    rev_list, ni_list = [float(v) for v in revenue.values], [float(v) for v in net_income.values]
+    rev_proj = project_growth(rev_list, 0.08, years)
+    ni_proj = project_growth(ni_list, 0.08, years)
+    shares = snapshot.shares_outstanding
+    prices = snapshot.yearly_prices(hist_years[0], hist_years[-1])
+    current = (rev_list[-1] * 1.05, snapshot.eps_ttm * shares, snapshot.current_price)
+    return charts.projection_chart(ticker, hist_years, rev_list, ni_list,
+                                   [prices.get(str(y), None) for y in hist_years], current,
+                                   rev_proj, ni_proj, price_targets(ni_proj, shares, 10.0).tolist(),
+                                   price_targets(ni_proj, shares, 20.0).tolist())
+
+
+def stage_render_app(provider, tickers, years):
+    # Static matplotlib PNG of the projection chart (console / headless path)
+    import charts
+    spec = _spec(provider, tickers[0], years)
+    return lambda: charts.to_png(spec)
+
+
+def stage_render_gui(provider, tickers, years):
+    # One slider step in the GUI: move the animated artists and blit (Agg canvas)
+    import charts
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    spec = _spec(provider, tickers[0], years)
+    fig = Figure(figsize=(10, 8))
+    canvas = FigureCanvasAgg(fig)
+    artists = {k: a for k, a in charts.draw(spec, fig.subplots(2, 1), annotate=False, animated=True).items()
+               if a.get_animated()}
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    def run():
+        charts.update(spec, artists)
+        canvas.restore_region(background)
+        for artist in artists.values():
+            artist.axes.draw_artist(artist)
+        canvas.blit(fig.bbox)
+    return run
+
+
+def stage_chart_spec(provider, tickers, years):
+    # Vega-Lite payload the web app sends instead of a PNG
+    import charts
+    spec = _spec(provider, tickers[0], years)
+    return lambda: json.dumps(charts.to_altair(spec).to_dict())
+
+
+def stage_export_excel(provider, tickers, years):
+    from Projections_Excel import export_to_excel
+    from projection import price_targets, project_growth
+    from snapshot import load_snapshot
+    snapshot = load_snapshot(tickers[0], provider=provider)
+    revenue, net_income = snapshot.revenue, snapshot.net_income
+    ni_proj = project_growth(net_income.values, 0.08, years)
+    projections = {"rev_proj": project_growth(revenue.values, 0.08, years), "ni_proj": ni_proj}
+    shares = snapshot.shares_outstanding
+    price_proj = {"low": price_targets(ni_proj, shares, 10.0), "high": price_targets(ni_proj, shares, 20.0)}
+    prices = snapshot.closes.resample("YE").last()
+    # export_to_excel relabels the price index in place, so hand it a fresh copy each time
+    return lambda: export_to_excel(tickers[0], revenue, net_income, projections, prices.copy(), price_proj,
+                                   snapshot.current_price, shares, snapshot.eps_ttm)
+
+
+def stage_export_bulk(provider, tickers, years):
+    from batch import DEFAULTS
+    from Projections_Excel import export_bulk
+    entries = [(t, dict(DEFAULTS)) for t in tickers]
+    return lambda: export_bulk(entries, "bench_bulk.xlsx", projection_years=years, provider=provider)
+
+
+def stage_streamlit_e2e(provider, tickers, years):
+    # Whole app.py script: first run, ticker entry, button press, chart
+    import streamlit as st
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+    set_log_level("error")  # bare-mode cache warnings
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+    def run():
+        st.cache_data.clear()  # cold run: every stage recomputes
+        at = AppTest.from_file(app, default_timeout=120)
+        at.run()
+        at.text_input[0].input(tickers[0]).run()
+        next(s for s in at.slider if s.label == "Projection Horizon (years)").set_value(years).run()
+        at.button[0].click().run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return run
+
+
+def run(args):
+    # Absolute paths: the export stages run in a scratch directory
+    fixtures = os.path.abspath(args.fixtures) if args.fixtures else tempfile.mkdtemp(prefix="bench-fixtures-")
+    output = os.path.abspath(args.output)
+    tickers_axis = [int(n) for n in args.tickers.split(",")]
+    years_axis = [int(y) for y in args.years.split(",")]
+    stages = args.stages.split(",") if args.stages else list(STAGES)
+
+    print(f"🧪 Writing fixtures for {max(tickers_axis)} tickers to {fixtures}...")
+    make_fixtures(fixtures, max(tickers_axis))
+    # Everything, including the Streamlit script, reads the fixtures through replay
+    os.environ["FINANCE_PROVIDER"] = f"replay:{fixtures}"
+    os.environ.setdefault("QUOTE_SOURCE", "simulated")
+    provider = ReplayProvider(fixtures)
+
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bench-out-"))  # export stages write their workbooks here
+    results = []
+    try:
+        for stage in stages:
+            factory = globals()[f"stage_{stage}"]
+            for n in tickers_axis if stage in PER_TICKER else tickers_axis[:1]:
+                for years in years_axis:
+                    fn = factory(provider, ticker_names(n), years)
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        fn()  # warm-up: imports, first-call caches (exports print progress)
+                        times = timed(fn, args.repeat)
+                    row = {"stage": stage, "tickers": n, "years": years, "repeat": args.repeat,
+                           "min_s": min(times), "median_s": statistics.median(times)}
+                    results.append(row)
+                    print(f"⏱️ {stage:<14} tickers={n:<5} years={years:<3} "
+                          f"min {row['min_s'] * 1000:9.2f} ms  median {row['median_s'] * 1000:9.2f} ms")
+    finally:
+        os.chdir(cwd)
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    report = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit,
+                       "python": sys.version.split()[0], "platform": platform.platform()},
+              "results": results}
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ {len(results)} measurements → '{output}'")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    key = lambda r: (r["stage"], r["tickers"], r["years"])
+    before = {key(r): r for r in baseline["results"]}
+
+    regressions = 0
+    print(f"{'stage':<14} {'tickers':>7} {'years':>5} {'before ms':>11} {'after ms':>11} {'change':>8}")
+    for row in current["results"]:
+        old = before.get(key(row))
+        if old is None:
+            continue
+        change = row["min_s"] / old["min_s"] - 1 if old["min_s"] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = " ❌ regression"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = " ✅ faster"
+        print(f"{row['stage']:<14} {row['tickers']:>7} {row['years']:>5} {old['min_s'] * 1000:>11.2f} "
+              f"{row['min_s'] * 1000:>11.2f} {change:>+8.1%}{flag}")
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fetch, projection, render and export stages.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="Time every stage and write a JSON report")
+    r.add_argument("--output", default="bench.json")
+    r.add_argument("--tickers", default=",".join(map(str, DEFAULT_TICKERS)),
+                   help="Comma-separated ticker counts, e.g. 1,10,100,1000,5000")
+    r.add_argument("--years", default=",".join(map(str, DEFAULT_YEARS)), help="Comma-separated projection horizons")
+    r.add_argument("--stages", help=f"Comma-separated subset of: {', '.join(STAGES)}")
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("--fixtures", help="Fixture directory to reuse (default: a fresh temp dir)")
+    c = sub.add_parser("compare", help="Flag stages that got slower between two reports")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
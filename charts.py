@@ -0,0 +1,315 @@
+from dataclasses import dataclass, field
+
+# One description of the projection chart, drawn by two backends:
+#   draw() / figure() / to_png()  matplotlib (console, GUI, headless Agg)
+#   to_altair()                   Vega-Lite for Streamlit, with hover tooltips
+# matplotlib and altair are imported lazily so each front-end only pays for its own.
+
+BLUE = "#1f77b4"    # tab:blue
+ORANGE = "#ff7f0e"  # tab:orange
+GRAY = "#7f7f7f"    # tab:gray
+
+# matplotlib linestyle -> Vega-Lite strokeDash
+DASHES = {"-": [1, 0], "--": [6, 4], ":": [2, 3], "-.": [6, 3, 2, 3]}
+
+
+@dataclass
+class Series:
+    key: str
+    name: str           # tooltip / Vega legend name, e.g. "Revenue"
+    kind: str           # "Historical", "Current" or "Projected"
+    x: list
+    y: list
+    color: str
+    linestyle: str = "-"
+    marker: str = None
+    label: str = None   # matplotlib legend entry; None keeps it out of the legend
+    dynamic: bool = False  # depends on the growth / P/E inputs
+
+
+@dataclass
+class Band:
+    key: str
+    name: str
+    x: list
+    lower: list
+    upper: list
+    color: str
+    alpha: float
+    label: str = None
+
+
+@dataclass
+class Change:
+    key: str
+    x_start: float
+    y_start: float
+    x_end: float
+    y_end: float
+    color: str
+    label: str
+    offset: int = 30  # label offset in points; negative puts it below the segment
+
+    @property
+    def pct(self):
+        return (self.y_end - self.y_start) / self.y_start * 100
+
+
+@dataclass
+class Panel:
+    title: str
+    ylabel: str
+    value_prefix: str = "$"
+    series: list = field(default_factory=list)
+    bands: list = field(default_factory=list)
+    changes: list = field(default_factory=list)
+
+
+@dataclass
+class ChartSpec:
+    ticker: str
+    x_labels: list
+    panels: list
+
+
+def _points(x, y):
+    # Drop missing values (e.g. no year-end close) but keep x aligned
+    pairs = [(xi, yi) for xi, yi in zip(x, y) if yi is not None]
+    return [p[0] for p in pairs], [float(p[1]) for p in pairs]
+
+
+def projection_chart(ticker, hist_years, rev_list, ni_list, price_hist_list, current,
+                     rev_proj, ni_proj, price_low_proj, price_high_proj, bands=None, current_label=None):
+    """Build the two-panel financials / price chart spec.
+
+    current is None or (rev_current, ni_current, current_price); bands is None
+    or monte_carlo.simulate() output (5/25/50/75/95 rows). current_label names
+    the current point on the x axis (default "<last year>.5").
+    """
+    insert_current = current is not None
+    n_hist = len(hist_years)
+    last_year = hist_years[-1]
+    proj_years = [last_year + i for i in range(1, len(rev_proj) + 1)]
+    all_years = hist_years + ([last_year + 0.5] if insert_current else []) + proj_years
+    x_labels = [str(y) if int(y) == y else current_label or f"{int(y)}.5" for y in all_years]
+
+    x_hist = list(range(n_hist))
+    x_proj = list(range(n_hist + (1 if insert_current else 0), len(all_years)))
+    x_prev, x_next = x_hist[-1], x_proj[0]
+
+    financials = Panel(f"{ticker} – Financials: {n_hist}-Year History + Current + {len(proj_years)}-Year Projection",
+                       "Billions USD")
+    prices = Panel(f"{ticker} – Stock Price: Historical, Current & Projected", "Stock Price (USD)")
+
+    for key, name, hist, proj, color in (("rev", "Revenue", rev_list, rev_proj, BLUE),
+                                         ("ni", "Net Income", ni_list, ni_proj, ORANGE)):
+        financials.series.append(Series(f"{key}_hist", name, "Historical", x_hist, hist, color,
+                                        marker="o", label=f"{name} (Historical)"))
+        if insert_current:
+            value = current[0] if key == "rev" else current[1]
+            x_curr = n_hist
+            # Solid from last historical to current, dotted from current to projection start
+            financials.series.append(Series(f"{key}_link", name, "Current", [x_prev, x_curr],
+                                            [hist[-1], value], color))
+            financials.series.append(Series(f"{key}_conn", name, "Projected", [x_curr, x_next],
+                                            [value, proj[0]], color, ":", dynamic=True))
+            financials.series.append(Series(f"{key}_current", name, "Current", [x_curr], [value], color, ":",
+                                            marker="o", label=f"{name} ({current_label or 'Current, est.'})"))
+        financials.series.append(Series(f"{key}_proj", name, "Projected", x_proj, proj, color, "--",
+                                        marker="o", label=f"{name} (Projected)", dynamic=True))
+
+    x_hist_price, y_hist_price = _points(x_hist, price_hist_list)
+    prices.series.append(Series("price_hist", "Price", "Historical", x_hist_price, y_hist_price, "blue",
+                                marker="o", label="Historical Price"))
+    # % change annotations start from the quote, or the last year-end close without one
+    if insert_current:
+        x_start, y_start = n_hist, current[2]
+        prices.series.append(Series("price_current", "Quote", "Current", [x_start], [y_start], "purple",
+                                    marker="o", label="Current Price (Quote)"))
+        if price_hist_list[-1] is not None:
+            prices.series.append(Series("price_link", "Quote", "Current", [x_prev, x_start],
+                                        [price_hist_list[-1], y_start], GRAY, ":"))
+    else:
+        x_start, y_start = x_prev, price_hist_list[-1]
+
+    for key, name, proj, color, offset in (("low", "Price Low", price_low_proj, "red", -40),
+                                           ("high", "Price High", price_high_proj, "green", 30)):
+        if y_start is not None:
+            prices.series.append(Series(f"{key}_conn", name, "Projected", [x_start, x_next],
+                                        [y_start, proj[0]], GRAY, ":", dynamic=True))
+            prices.changes.append(Change(f"{key}_change", x_start, y_start, x_next, proj[0],
+                                         color, f"{name.split()[-1]} Price", offset))
+        prices.series.append(Series(key, name, "Projected", x_proj, proj, color, "-.", marker="x",
+                                    label=f"{name} Estimate", dynamic=True))
+
+    if bands is not None:
+        for panel, band_key, name, color in ((financials, "revenue", "Revenue MC", BLUE),
+                                             (financials, "net_income", "Net Income MC", ORANGE),
+                                             (prices, "price", "Price MC", GRAY)):
+            band = [list(map(float, row)) for row in bands[band_key]]
+            panel.bands.append(Band(f"{band_key}_90", name, x_proj, band[0], band[4], color, 0.12,
+                                    f"{name} 5–95%"))
+            panel.bands.append(Band(f"{band_key}_50", name, x_proj, band[1], band[3], color, 0.25,
+                                    f"{name} 25–75%"))
+            panel.series.append(Series(f"{band_key}_median", f"{name} median", "Projected", x_proj, band[2],
+                                       color, dynamic=True))
+
+    return ChartSpec(ticker, x_labels, [financials, prices])
+
+
+# --- matplotlib backend -------------------------------------------------------
+
+def draw(spec, axes, annotate=True, animated=False):
+    """Draw spec onto existing axes (one per panel).
+
+    annotate adds the per-point value labels; animated marks the input-dependent
+    artists for blitting. Returns {key: artist} for in-place updates.
+    """
+    artists = {}
+    for ax, panel in zip(axes, spec.panels):
+        for band in panel.bands:
+            artists[band.key] = ax.fill_between(band.x, band.lower, band.upper, color=band.color,
+                                                alpha=band.alpha, label=band.label)
+        for s in panel.series:
+            artists[s.key], = ax.plot(s.x, s.y, label=s.label, marker=s.marker, linestyle=s.linestyle,
+                                      color=s.color, linewidth=1.5, animated=animated and s.dynamic)
+        for c in panel.changes:
+            artists[c.key] = ax.annotate(f"{c.label}\n{c.pct:+.1f}%", xy=((c.x_start + c.x_end) / 2, (c.y_start + c.y_end) / 2),
+                                         xytext=(0, c.offset), textcoords='offset points', ha='center', fontsize=9,
+                                         color=c.color, arrowprops=dict(arrowstyle='->', color=c.color, lw=1),
+                                         animated=animated)
+
+        ax.set_ylabel(panel.ylabel)
+        ax.set_title(panel.title)
+        ax.grid(True)
+        ax.legend()
+        ax.set_xticks(range(len(spec.x_labels)), labels=spec.x_labels)
+
+        if annotate:
+            ymin, ymax = ax.get_ylim()
+            ax.set_ylim(ymin, ymax * 1.15)
+            for s in panel.series:
+                if s.marker is None:
+                    continue
+                for x, y in zip(s.x, s.y):
+                    ax.annotate(f"{panel.value_prefix}{y:.2f}", (x, y), textcoords="offset points", xytext=(0, 8),
+                                ha='center', fontsize=9, color=s.color)
+    return artists
+
+
+def update(spec, artists):
+    """Move the dynamic artists returned by draw(animated=True) to a new spec's data."""
+    for panel in spec.panels:
+        for s in panel.series:
+            if s.dynamic and s.key in artists:
+                artists[s.key].set_data(s.x, s.y)
+        for c in panel.changes:
+            if c.key in artists:
+                artists[c.key].set_text(f"{c.label}\n{c.pct:+.1f}%")
+                artists[c.key].xy = ((c.x_start + c.x_end) / 2, (c.y_start + c.y_end) / 2)
+
+
+def figure(spec, annotate=True, figsize=(12, 10)):
+    # pyplot figure, for plt.show() in the console
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(len(spec.panels), 1, figsize=figsize, sharex=True)
+    draw(spec, axes, annotate)
+    return fig
+
+
+def to_image(spec, fmt="png", annotate=True, figsize=(12, 10), dpi=200):
+    # Agg without pyplot: no global figure registry, safe off the main thread
+    import io
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(spec, fig.subplots(len(spec.panels), 1, sharex=True), annotate)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+    fig.clear()  # drop the artists now rather than at the next gc cycle
+    return buf.getvalue()
+
+
+def to_png(spec, annotate=True, figsize=(12, 10), dpi=200):
+    return to_image(spec, "png", annotate, figsize, dpi)
+
+
+# --- Vega-Lite backend --------------------------------------------------------
+
+def to_altair(spec, height=320):
+    """Interactive Vega-Lite chart; hover tooltips replace the static value labels."""
+    import altair as alt
+    import pandas as pd
+
+    sort = spec.x_labels
+    x = alt.X("year:O", sort=sort, title=None, axis=alt.Axis(labelAngle=0))
+    charts = []
+    for panel in spec.panels:
+        lines = pd.DataFrame([
+            {"key": s.key, "name": s.name, "kind": s.kind, "year": spec.x_labels[xi], "value": yi,
+             "dash": s.linestyle, "marker": s.marker}
+            for s in panel.series for xi, yi in zip(s.x, s.y)
+        ])
+        names = list(dict.fromkeys(s.name for s in panel.series))
+        colors = {}
+        for s in sorted(panel.series, key=lambda s: s.marker is None):
+            colors.setdefault(s.name, s.color)  # marker series define the legend colour
+        color = alt.Color("name:N", title=None, scale=alt.Scale(domain=names, range=[colors[n] for n in names]))
+        tooltip = [alt.Tooltip("name:N", title="Series"), alt.Tooltip("kind:N", title=" "),
+                   alt.Tooltip("year:N", title="Year"),
+                   alt.Tooltip("value:Q", title=panel.ylabel, format=",.2f")]
+
+        layers = []
+        for band in panel.bands:
+            area = pd.DataFrame({"year": [spec.x_labels[xi] for xi in band.x], "lower": band.lower,
+                                 "upper": band.upper, "band": band.label})
+            layers.append(alt.Chart(area).mark_area(opacity=band.alpha, color=band.color).encode(
+                x=x, y="lower:Q", y2="upper:Q",
+                tooltip=[alt.Tooltip("band:N", title="Band"), alt.Tooltip("year:N", title="Year"),
+                         alt.Tooltip("lower:Q", format=",.2f"), alt.Tooltip("upper:Q", format=",.2f")]))
+
+        dash = alt.StrokeDash("dash:N", legend=None,
+                              scale=alt.Scale(domain=list(DASHES), range=list(DASHES.values())))
+        layers.append(alt.Chart(lines).mark_line().encode(
+            x=x, y=alt.Y("value:Q", title=panel.ylabel, scale=alt.Scale(zero=False)),
+            color=color, strokeDash=dash, detail="key:N"))
+        layers.append(alt.Chart(lines[lines["marker"].notna()]).mark_point(filled=True, size=60).encode(
+            x=x, y="value:Q", color=color,
+            shape=alt.Shape("marker:N", legend=None, scale=alt.Scale(domain=["o", "x"], range=["circle", "cross"])),
+            tooltip=tooltip))
+
+        for c in panel.changes:
+            label = pd.DataFrame([{"year": spec.x_labels[c.x_end], "value": c.y_end,
+                                   "text": f"{c.label} {c.pct:+.1f}%"}])
+            layers.append(alt.Chart(label).mark_text(align="right", dx=-8, dy=-12 if c.offset > 0 else 14,
+                                                     fontSize=11, color=c.color).encode(
+                x=x, y="value:Q", text="text:N"))
+
+        charts.append(alt.layer(*layers).properties(title=panel.title, height=height, width="container"))
+
+    return alt.vconcat(*charts).resolve_scale(color="independent")
+
+
+def tornado(labels, base, low, high, title, value_title="Price Target (USD)"):
+    """Horizontal tornado chart: one bar per input from its low- to high-bump value around base."""
+    import altair as alt
+    import pandas as pd
+
+    rows = pd.DataFrame({"input": labels, "low": low, "high": high})
+    rows["swing"] = (rows["high"] - rows["low"]).abs()
+    rows = rows.sort_values("swing", ascending=False)
+    bars = pd.concat([
+        pd.DataFrame({"input": rows["input"], "case": "Input −", "start": base, "end": rows["low"]}),
+        pd.DataFrame({"input": rows["input"], "case": "Input +", "start": base, "end": rows["high"]}),
+    ])
+    bars["change"] = bars["end"] / base - 1
+    y = alt.Y("input:N", sort=list(rows["input"]), title=None)
+    chart = alt.Chart(bars).mark_bar().encode(
+        x=alt.X("start:Q", title=value_title, scale=alt.Scale(zero=False)), x2="end:Q", y=y,
+        color=alt.Color("case:N", title=None, scale=alt.Scale(domain=["Input −", "Input +"], range=["red", "green"])),
+        tooltip=[alt.Tooltip("input:N", title="Input"), alt.Tooltip("case:N", title="Bump"),
+                 alt.Tooltip("end:Q", title=value_title, format=",.2f"),
+                 alt.Tooltip("change:Q", title="Change", format="+.1%")])
+    rule = alt.Chart(pd.DataFrame({"base": [base]})).mark_rule(color=GRAY, strokeDash=[4, 2]).encode(x="base:Q")
+    return alt.layer(chart, rule).properties(title=title, width="container")
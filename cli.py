@@ -0,0 +1,213 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+# Non-interactive entry point for the console and Excel tools; prints JSON.
+#   python cli.py project AAPL MSFT --rev-growth 0.1 --pe-low 15 --pe-high 30
+#   python cli.py export AAPL MSFT --output watchlist.xlsx
+#   python cli.py chart AAPL --output aapl.svg
+#   python cli.py render --watchlist watchlist.csv --out-dir charts --format svg
+#   python cli.py backtest --watchlist watchlist.csv --start-year 2005 --trailing-growth 3
+# Only the standard library is imported up front. pandas, matplotlib and
+# xlsxwriter load on the paths that need them, and `project` keeps its inputs
+# in the data cache as plain numbers, so a cache hit never imports them.
+
+# Same values as batch.DEFAULTS and projection.HISTORY_YEARS/PROJECTION_YEARS,
+# repeated here so --help and cache hits don't pull in numpy and pandas
+DEFAULTS = {"rev_growth": 0.08, "ni_growth": 0.08, "pe_low": 10.0, "pe_high": 20.0}
+HISTORY_YEARS = 4
+PROJECTION_YEARS = 4
+
+
+def _provider_spec(args):
+    return args.provider or os.environ.get("FINANCE_PROVIDER", "yahoo")
+
+
+def load_basis(ticker, history_years, provider, use_ttm=False):
+    """Projections_Console.projection_basis(), cached for live data (TTL 'basis')."""
+    import data_cache
+
+    def fetch():
+        from Projections_Console import projection_basis
+        return projection_basis(ticker, history_years, provider, use_ttm)
+
+    if provider.partition(":")[0] != "yahoo":
+        return fetch()  # record/replay bypass the cache, like everywhere else
+    return data_cache.cached(ticker, "basis", fetch, key=f"years={history_years}" + (",ttm" if use_ttm else ""))
+
+
+def project(basis, rev_growth, ni_growth, pe_low, pe_high, years=PROJECTION_YEARS):
+    # Scalar form of projection.project_paths / price_targets (no numpy import)
+    shares = basis["shares_outstanding"]
+    rev_proj = [basis["revenue"] * (1 + rev_growth) ** k for k in range(1, years + 1)]
+    ni_proj = [basis["net_income"] * (1 + ni_growth) ** k for k in range(1, years + 1)]
+    return {
+        **basis,
+        "years": [basis["last_year"] + k for k in range(1, years + 1)],
+        "rev_proj": rev_proj,
+        "ni_proj": ni_proj,
+        "price_low": [ni / shares * pe_low for ni in ni_proj],
+        "price_high": [ni / shares * pe_high for ni in ni_proj],
+    }
+
+
+def cmd_project(args):
+    results = []
+    for ticker in args.tickers:
+        try:
+            basis = load_basis(ticker, args.history_years, _provider_spec(args), args.ttm)
+            results.append(project(basis, args.rev_growth, args.ni_growth, args.pe_low, args.pe_high,
+                                   args.projection_years))
+        except Exception as e:
+            results.append({"ticker": ticker, "error": f"{type(e).__name__}: {e}"})
+    return results, any("error" in r for r in results)
+
+
+def cmd_export(args):
+    from Projections_Excel import export_bulk
+    entries = [(ticker, {key: getattr(args, key) for key in DEFAULTS}) for ticker in args.tickers]
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout for the JSON result
+        failures = export_bulk(entries, args.output, long_format=args.long, workers=args.workers,
+                               history_years=args.history_years, projection_years=args.projection_years,
+                               provider=_provider_spec(args))
+    result = {"output": os.path.abspath(args.output), "exported": len(entries) - len(failures),
+              "failures": [{"ticker": ticker, "error": error} for ticker, error in failures]}
+    return result, bool(failures)
+
+
+def cmd_chart(args):
+    import charts
+    from Projections_Console import chart_spec
+    from snapshot import load_snapshot
+    ticker = args.ticker
+    output = args.output or f"{ticker}_projection.png"
+    snapshot = load_snapshot(ticker, args.history_years, provider=_provider_spec(args))
+    ttm = None
+    if args.ttm:
+        from ttm import load_ttm
+        ttm = load_ttm(ticker, _provider_spec(args))
+    spec = chart_spec(ticker, snapshot, args.rev_growth, args.ni_growth, args.pe_low, args.pe_high,
+                      args.history_years, args.projection_years, ttm)
+    if spec is None:
+        return {"ticker": ticker, "error": "not enough financial data or shares outstanding"}, True
+    fmt = os.path.splitext(output)[1].lstrip(".").lower() or "png"
+    image = charts.to_image(spec, fmt, dpi=args.dpi)
+    with open(output, "wb") as f:
+        f.write(image)
+    return {"ticker": ticker, "output": os.path.abspath(output), "bytes": len(image)}, False
+
+
+def cmd_render(args):
+    from render import render_watchlist
+    entries = [(ticker, {key: getattr(args, key) for key in DEFAULTS}) for ticker in args.tickers]
+    invalid = []  # watchlist rows with a bad assumption cell, reported with the render failures
+    if args.watchlist:
+        from batch import read_watchlist
+        entries += read_watchlist(args.watchlist, {key: getattr(args, key) for key in DEFAULTS}, invalid)
+    failures = [{"ticker": ticker, "error": f"{type(e).__name__}: {e}"} for ticker, e in invalid]
+    if not entries and not failures:
+        return {"error": "no tickers: pass them as arguments or with --watchlist"}, True
+    summary = render_watchlist(entries, args.out_dir, args.format, args.dpi, args.workers,
+                               args.max_tasks_per_child, args.history_years, args.projection_years,
+                               _provider_spec(args), progress=lambda msg: print(msg, file=sys.stderr),
+                               use_ttm=args.ttm)
+    result = {"out_dir": os.path.abspath(args.out_dir), "format": args.format, "rendered": summary["rendered"],
+              "seconds": round(summary["seconds"], 3),
+              "peak_rss_mb": {str(pid): round(mb, 1) for pid, mb in summary["peak_rss_mb"].items()},
+              "failures": failures + [{"ticker": ticker, "error": error} for ticker, error in summary["failures"]]}
+    return result, bool(result["failures"])
+
+
+def cmd_backtest(args):
+    import time
+    import backtest
+    import timing
+    tickers = list(args.tickers)
+    if args.watchlist:
+        from batch import read_watchlist
+        invalid = []  # assumption cells don't matter here, so keep those tickers too
+        tickers += [ticker for ticker, _ in read_watchlist(args.watchlist, invalid=invalid) + invalid]
+    if not tickers:
+        return {"error": "no tickers: pass them as arguments or with --watchlist"}, True
+    end_year = args.end_year or time.localtime().tm_year - 1
+    names, years, net_income, prices, shares, failures = backtest.load_panel(
+        tickers, args.start_year, end_year, _provider_spec(args), args.workers)
+
+    start = time.perf_counter()
+    with timing.span("compute.backtest", tickers=len(names), years=len(years)):
+        growth = backtest.trailing_growth(net_income, args.trailing_growth) if args.trailing_growth else args.ni_growth
+        result = backtest.run(net_income, prices, shares, growth, args.pe_low, args.pe_high, args.projection_years)
+        by_horizon = backtest.summary(result)
+        by_year = backtest.summary(result, years, by="year")
+    seconds = time.perf_counter() - start
+    records = lambda frame: json.loads(frame.to_json(orient="records"))  # NaN -> null
+    return {"tickers": len(names), "years": [args.start_year, end_year],
+            "growth": f"trailing {args.trailing_growth}y CAGR" if args.trailing_growth else args.ni_growth,
+            "pe_band": [args.pe_low, args.pe_high], "scored": int(result["valid"].sum()),
+            "seconds": round(seconds, 4), "by_horizon": records(by_horizon), "by_year": records(by_year),
+            "failures": [{"ticker": ticker, "error": error} for ticker, error in failures]}, bool(failures)
+
+
+def main(argv=None):
+    inputs = argparse.ArgumentParser(add_help=False)
+    for key, default in DEFAULTS.items():
+        inputs.add_argument(f"--{key.replace('_', '-')}", dest=key, type=float, default=default,
+                            help=f"(default: {default})")
+    inputs.add_argument("--history-years", type=int, default=HISTORY_YEARS)
+    inputs.add_argument("--projection-years", type=int, default=PROJECTION_YEARS)
+    inputs.add_argument("--ttm", action="store_true",
+                        help="Start from trailing-twelve-month values (quarterly statements), not the last fiscal year")
+    inputs.add_argument("--provider", help="yahoo, record[:DIR] or replay[:DIR] (default: $FINANCE_PROVIDER or yahoo)")
+
+    parser = argparse.ArgumentParser(description="Stock projections without prompts; results are printed as JSON.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("project", parents=[inputs], help="Project revenue, net income and price targets")
+    p.add_argument("tickers", nargs="+")
+    p.set_defaults(run=cmd_project)
+    e = sub.add_parser("export", parents=[inputs], help="Write projections to an Excel workbook")
+    e.add_argument("tickers", nargs="+")
+    e.add_argument("--output", default="watchlist_financial_projection.xlsx")
+    e.add_argument("--long", action="store_true", help="One long-format 'Projections' sheet instead of one per ticker")
+    e.add_argument("--workers", type=int, default=8)
+    e.set_defaults(run=cmd_export)
+    c = sub.add_parser("chart", parents=[inputs], help="Render one projection chart (PNG or SVG)")
+    c.add_argument("ticker")
+    c.add_argument("--output", help="Image path; .png or .svg (default: <TICKER>_projection.png)")
+    c.add_argument("--dpi", type=int, default=200)
+    c.set_defaults(run=cmd_chart)
+    r = sub.add_parser("render", parents=[inputs], help="Render charts for many tickers on a process pool")
+    r.add_argument("tickers", nargs="*")
+    r.add_argument("--watchlist", help="CSV with a 'ticker' column and optional assumptions; or one ticker per line")
+    r.add_argument("--out-dir", default="charts")
+    r.add_argument("--format", choices=("png", "svg"), default="png")
+    r.add_argument("--dpi", type=int, default=150)
+    r.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    r.add_argument("--max-tasks-per-child", type=int, default=100,
+                   help="Tickers per worker before it is replaced, bounding its memory")
+    r.set_defaults(run=cmd_render)
+    b = sub.add_parser("backtest", parents=[inputs],
+                       help="Score the growth x P/E band against realized year-end prices (horizons 1..--projection-years)")
+    b.add_argument("tickers", nargs="*")
+    b.add_argument("--watchlist", help="CSV with a 'ticker' column; or one ticker per line")
+    b.add_argument("--start-year", type=int, default=2005, help="First origin year (default: 2005)")
+    b.add_argument("--end-year", type=int, help="Last year of prices (default: last year)")
+    b.add_argument("--trailing-growth", type=int, metavar="YEARS",
+                   help="Grow net income at its trailing CAGR over YEARS (as known each year) instead of --ni-growth")
+    b.add_argument("--workers", type=int, default=8)
+    b.set_defaults(run=cmd_backtest)
+    args = parser.parse_args(argv)
+
+    if hasattr(args, "tickers"):
+        args.tickers = [t.upper() for t in args.tickers]
+    else:
+        args.ticker = args.ticker.upper()
+    result, failed = args.run(args)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import argparse
+import os
+import pickle
+import re
+import threading
+import time
+
+import timing
+
+# On-disk cache for Yahoo data, one directory per ticker:
+#   .cache/<TICKER>/<kind>[-<key>].pkl
+# The data provider (yfinance by default) is only called on a miss, so a warm
+# cache never touches the network.
+
+CACHE_DIR = os.environ.get(
+    "FINANCE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+MAX_CACHE_BYTES = int(float(os.environ.get("FINANCE_CACHE_MAX_MB", "512")) * 1024 * 1024)  # .pkl entries only, not _prices/
+# store() keeps a running size and only rescans the directory when that goes
+# over MAX_CACHE_BYTES, or every EVICT_EVERY stores / EVICT_INTERVAL seconds
+# to pick up what other processes wrote
+EVICT_EVERY = 500
+EVICT_INTERVAL = 60
+EVICT_TO = 0.9  # evict down to this fraction of the limit, leaving headroom before the next scan
+
+# Seconds each kind of data stays fresh
+TTL = {
+    "financials": 7 * 24 * 3600,  # annual statements change a few times a year
+    "info": 15 * 60,              # quotes, shares outstanding, EPS
+    "history": 12 * 3600,         # daily closes
+    "basis": 15 * 60,             # cli.py projection inputs (include the quote)
+    "quarterly": 24 * 3600,       # ttm.py rolling window; a refresh adds at most a quarter
+}
+
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9_.=-]+")
+
+_usage_lock = threading.Lock()
+_evict_lock = threading.Lock()
+_cache_bytes = None  # unknown until the first scan
+_stores_since_scan = 0
+_scanned_at = 0.0
+
+
+def _ticker_dir(ticker):
+    return os.path.join(CACHE_DIR, _SAFE_KEY.sub("_", ticker.upper()))
+
+
+def _entry_path(ticker, kind, key=""):
+    name = f"{kind}-{_SAFE_KEY.sub('_', key)}" if key else kind
+    return os.path.join(_ticker_dir(ticker), f"{name}.pkl")
+
+
+def load(ticker, kind, key="", ttl=None):
+    """Return the cached value, or None if missing or older than ttl (default: its kind's TTL)."""
+    path = _entry_path(ticker, kind, key)
+    try:
+        with open(path, "rb") as f:
+            stored_at, value = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if time.time() - stored_at > (TTL.get(kind, 0) if ttl is None else ttl):
+        return None
+    try:
+        os.utime(path)  # mtime doubles as last-used time for eviction
+    except OSError:
+        pass  # evicted or invalidated since the read; the value is still good
+    return value
+
+
+def store(ticker, kind, value, key=""):
+    path = _entry_path(ticker, kind, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+    size = os.path.getsize(tmp)
+    try:
+        replaced = os.path.getsize(path)
+    except OSError:
+        replaced = 0
+    os.replace(tmp, path)
+    _account(size - replaced)
+    return size
+
+
+def _account(delta):
+    global _cache_bytes, _stores_since_scan, _scanned_at
+    with _usage_lock:
+        _stores_since_scan += 1
+        if _cache_bytes is not None:
+            _cache_bytes += delta
+        due = (_cache_bytes is None or _cache_bytes > MAX_CACHE_BYTES or _stores_since_scan >= EVICT_EVERY
+               or time.monotonic() - _scanned_at > EVICT_INTERVAL)
+        if due:
+            # Claim the rescan so concurrent stores don't all start one
+            _stores_since_scan, _scanned_at = 0, time.monotonic()
+    if due:
+        evict()
+
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if hasattr(value, "empty"):
+        return value.empty
+    return not value
+
+
+def cached(ticker, kind, fetch, key=""):
+    with timing.span(f"fetch.{kind}", ticker=ticker) as span:
+        value = load(ticker, kind, key)
+        if value is not None:
+            span.set(cache="hit")
+            return value
+        span.set(cache="miss")
+        value = fetch()
+        # Don't pin failed or empty responses for a whole TTL
+        if not _is_empty(value):
+            span.set(bytes=store(ticker, kind, value, key))
+    return value
+
+
+def tickers():
+    """Tickers with a cache directory (internal stores such as _prices excluded)."""
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    return sorted(name for name in os.listdir(CACHE_DIR)
+                  if not name.startswith("_") and os.path.isdir(os.path.join(CACHE_DIR, name)))
+
+
+def _entries():
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for ticker in os.listdir(CACHE_DIR):
+        tdir = os.path.join(CACHE_DIR, ticker)
+        if not os.path.isdir(tdir):
+            continue
+        for name in os.listdir(tdir):
+            if name.endswith(".pkl"):
+                try:
+                    st = os.stat(os.path.join(tdir, name))
+                except OSError:  # removed by another thread or process since listdir
+                    continue
+                entries.append((st.st_mtime, st.st_size, os.path.join(tdir, name)))
+    return entries
+
+
+def evict(max_bytes=None):
+    """Drop least recently used entries once the cache exceeds max_bytes, down to EVICT_TO of it."""
+    global _cache_bytes, _stores_since_scan, _scanned_at
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = _entries()
+        total = sum(size for _, size, _ in entries)
+        target = max_bytes * EVICT_TO if total > max_bytes else max_bytes
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with _usage_lock:
+            _cache_bytes, _stores_since_scan, _scanned_at = total, 0, time.monotonic()
+
+
+def invalidate(tickers=None, kind=None):
+    """Remove cached entries for the given tickers (all if None), optionally only one kind.
+
+    Daily closes live in price_store's Parquet files, not here; they are
+    removed too unless kind is something other than "history".
+    """
+    global _cache_bytes
+    removed = freed = 0
+    if kind in (None, "history"):
+        import price_store  # imports this module
+        removed += price_store.invalidate(tickers)
+    for _, size, path in _entries():
+        ticker = os.path.basename(os.path.dirname(path))
+        name = os.path.basename(path)[:-len(".pkl")]
+        if tickers and ticker not in {_SAFE_KEY.sub("_", t.upper()) for t in tickers}:
+            continue
+        if kind and name.split("-", 1)[0] != kind:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue  # already evicted or invalidated elsewhere
+        removed += 1
+        freed += size
+    with _usage_lock:
+        if _cache_bytes is not None:
+            _cache_bytes -= freed
+    return removed
+
+
+class CachedTicker:
+    """yf.Ticker-like .financials / .info / .closes() served through the cache.
+
+    Data comes from a providers.DataProvider (default: FINANCE_PROVIDER);
+    providers that aren't cacheable, like fixture replay, skip the cache.
+    """
+
+    def __init__(self, ticker, provider=None):
+        from providers import get_provider
+        self.ticker = ticker.upper()
+        self.provider = get_provider(provider)
+        self._info = None
+
+    def _cached(self, kind, fetch):
+        if not self.provider.cacheable:
+            with timing.span(f"fetch.{kind}", ticker=self.ticker, cache="bypass"):
+                return fetch()
+        return cached(self.ticker, kind, fetch)
+
+    @property
+    def financials(self):
+        return self._cached("financials", lambda: self.provider.financials(self.ticker))
+
+    @property
+    def info(self):
+        if self._info is None:
+            self._info = self._cached("info", lambda: self.provider.info(self.ticker))
+        return self._info
+
+    def closes(self, start, end=None):
+        import price_store
+        return price_store.closes(self.ticker, start, end, provider=self.provider)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local Yahoo data cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    inv = sub.add_parser("invalidate", help="Delete cached entries")
+    inv.add_argument("tickers", nargs="*", help="Tickers to drop (default: all)")
+    inv.add_argument("--kind", choices=sorted(TTL), help="Only drop this kind of data")
+    sub.add_parser("stats", help="Show cache size")
+    args = parser.parse_args()
+
+    if args.command == "invalidate":
+        removed = invalidate(args.tickers, args.kind)
+        print(f"🗑️ Removed {removed} cached entries from {CACHE_DIR}")
+    else:
+        entries = _entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"📦 {len(entries)} entries, {total / 1024 / 1024:.1f} MB of {MAX_CACHE_BYTES / 1024 / 1024:.0f} MB in {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
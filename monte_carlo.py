@@ -0,0 +1,88 @@
+import numpy as np
+
+from projection import PROJECTION_YEARS
+
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_SIZE = 25_000
+HISTOGRAM_BINS = 4096
+PILOT_PATHS = 10_000  # sizes the histogram edges, drawn apart from the simulated paths
+
+
+class StreamingPercentiles:
+    """Per-column percentiles over any number of rows using fixed-size histograms.
+
+    Bin edges come from a pilot sample (its 0.1-99.9% range, padded by half
+    on each side), which is not counted. Values outside the edges are clamped
+    into the first / last bin: counts stay complete, so percentiles inside
+    the edges are exact up to one bin width, while percentiles that fall in
+    the clamped tails would only be bounded by the edges.
+    """
+
+    def __init__(self, pilot, bins=HISTOGRAM_BINS):
+        lo = np.percentile(pilot, 0.1, axis=0)
+        hi = np.percentile(pilot, 99.9, axis=0)
+        pad = (hi - lo) * 0.5 + 1e-9 * np.maximum(np.abs(lo), 1)
+        self.lo = lo - pad
+        self.width = (hi - lo + 2 * pad) / bins
+        self.bins = bins
+        self.counts = np.zeros((pilot.shape[1], bins), dtype=np.int64)
+
+    def add(self, chunk):
+        n_cols = chunk.shape[1]
+        idx = np.clip(((chunk - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        flat = idx + np.arange(n_cols) * self.bins
+        self.counts += np.bincount(flat.ravel(), minlength=n_cols * self.bins).reshape(n_cols, self.bins)
+
+    def percentiles(self, qs=PERCENTILES):
+        cdf = np.cumsum(self.counts, axis=1)
+        total = cdf[:, -1]
+        rows = np.arange(len(total))
+        out = np.empty((len(qs), len(total)))
+        for i, q in enumerate(qs):
+            target = q / 100 * total
+            k = np.argmax(cdf >= target[:, None], axis=1)
+            below = np.where(k > 0, cdf[rows, k - 1], 0)
+            in_bin = np.maximum(self.counts[rows, k], 1)
+            frac = np.clip((target - below) / in_bin, 0, 1)
+            out[i] = self.lo + (k + frac) * self.width
+        return out
+
+
+def _growth_paths(rng, start_value, growth_mean, growth_std, n, years):
+    growth = rng.normal(growth_mean, growth_std, size=(n, years))
+    # A year can't lose more than 99% of the base
+    return start_value * np.cumprod(1 + np.maximum(growth, -0.99), axis=1)
+
+
+def simulate(rev_start, ni_start, shares_outstanding, rev_growth, ni_growth, growth_std,
+             pe_low, pe_high, years=PROJECTION_YEARS, n_paths=100_000, seed=0,
+             chunk_size=CHUNK_SIZE, percentiles=PERCENTILES):
+    """Monte Carlo fan bands for revenue, net income and price.
+
+    Every path draws an independent growth rate per year around rev_growth /
+    ni_growth (normal, growth_std) and one exit P/E uniformly from
+    [pe_low, pe_high]. Paths are generated chunk_size at a time into
+    streaming histograms, so memory does not grow with n_paths. The
+    histogram edges come from PILOT_PATHS separate paths and each input
+    stream has its own child generator, so results depend only on the seed,
+    not on the chunk size.
+
+    Returns {"revenue" | "net_income" | "price": array (len(percentiles), years)}.
+    """
+    streams = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(6)]
+
+    def paths(rev_rng, ni_rng, pe_rng, n):
+        rev = _growth_paths(rev_rng, rev_start, rev_growth, growth_std, n, years)
+        ni = _growth_paths(ni_rng, ni_start, ni_growth, growth_std, n, years)
+        pe = pe_rng.uniform(min(pe_low, pe_high), max(pe_low, pe_high), size=(n, 1))
+        return {"revenue": rev, "net_income": ni, "price": ni / shares_outstanding * pe}
+
+    stats = {name: StreamingPercentiles(pilot) for name, pilot in paths(*streams[3:], PILOT_PATHS).items()}
+    done = 0
+    while done < n_paths:
+        n = min(chunk_size, n_paths - done)
+        for name, chunk in paths(*streams[:3], n).items():
+            stats[name].add(chunk)
+        done += n
+
+    return {name: hist.percentiles(percentiles) for name, hist in stats.items()}
@@ -1,94 +1,90 @@
+import datetime
+
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import matplotlib.pyplot as plt
+
+import portfolio
+import positions
+import quotes
+import timing
 
 st.title("Wall Street Bets")
 
-# Ticker symbol
-ticker_symbol = "PLTR"
-ticker = yf.Ticker(ticker_symbol)
-
-# Fetch data
-company_name = ticker.info.get("longName")
-current_price = ticker.history(period="1d")["Close"].iloc[-1]
-pe_ratio = ticker.info.get("trailingPE")
-market_cap = ticker.info.get("marketCap")
-
-# Authenticate using the JSON key
-url = "https://docs.google.com/spreadsheets/d/1pE7_z49F9TkKy4obgd63b1Ioo6V0ZmM0VhmZk78XQLY/export?format=csv"
-df = pd.read_csv(url)
-
-raw_profit = df.iloc[15, 1]  # string from sheet
-str_profit = str(raw_profit).replace(",", ".")  # swap comma with dot
-Profit = pd.to_numeric(str_profit, errors="coerce")
-raw_cost = df.iloc[11, 2]
-str_cost = str(raw_cost).replace(",", ".")  # swap comma with dot
-Cost = pd.to_numeric(str_cost, errors="coerce")
-raw_value = df.iloc[12, 1]  # string from sheet
-str_value = str(raw_value).replace(",", ".")  # swap comma with dot
-Value = pd.to_numeric(str_value, errors="coerce")
-margin = Value * 0.2
-# Display in Streamlit
-
-st.header(f"{company_name} ({ticker_symbol})")
-
-# Use columns for side-by-side display
-col1, col2 = st.columns(2)
-
-col1, col2 = st.columns([1, 1])  # center it in col2
-with col1:
-    st.header("Short Position")
-    st.metric("💰 Current Position Value", f"${Value:,.2f}")
-    st.metric("💰 Cost Basis", f"${Cost:,.2f}")
-    st.metric("📊 Total Margin", f"${margin:,.2f}")
-    color = "green" if Profit > 0 else "red"
-    st.markdown(f'<div style="font-size:28px;">📈 Profit: <span style="color:{"green" if Profit>0 else "red"}">${Profit:,.2f}</span></div>', unsafe_allow_html=True)
-with col2:
-    st.header("Stock Info")
-    st.metric(label="💰 Current Price", value=f"${current_price:.2f}")
-    st.metric(label="📊 P/E Ratio (Trailing)", value=f"{pe_ratio:.2f}" if pe_ratio else 'N/A')
-    st.line_chart(ticker.history(period="24mo")["Close"],height=300)
-# Optional: Add a line chart for price history
-##############################################################################################
-# Ticker symbol
-ticker_symbol = "LIF"
-ticker = yf.Ticker(ticker_symbol)
-
-# Fetch data
-company_name = ticker.info.get("longName")
-current_price = ticker.history(period="1d")["Close"].iloc[-1]
-pe_ratio = ticker.info.get("trailingPE")
-market_cap = ticker.info.get("marketCap")
-
-raw_profit = df.iloc[15, 4]  # string from sheet
-str_profit = str(raw_profit).replace(",", ".")  # swap comma with dot
-Profit = pd.to_numeric(str_profit, errors="coerce")
-raw_cost = df.iloc[11, 4]
-str_cost = str(raw_cost).replace(",", ".")  # swap comma with dot
-Cost = pd.to_numeric(str_cost, errors="coerce")
-raw_value = df.iloc[12, 3]  # string from sheet
-str_value = str(raw_value).replace(",", ".")  # swap comma with dot
-Value = pd.to_numeric(str_value, errors="coerce")
-margin = Value * 0.2
-
-st.header(f"{company_name} ({ticker_symbol})")
-
-# Use columns for side-by-side display
-col1, col2 = st.columns(2)
-
-col1, col2 = st.columns([1, 1])  # center it in col2
-with col1:
-    st.header("Short Position")
-    st.metric("💰 Current Position Value", f"${Value:,.2f}")
-    st.metric("💰 Cost Basis", f"${Cost:,.2f}")
-    st.metric("📊 Total Margin", f"${margin:,.2f}")
-    color = "green" if Profit > 0 else "red"
-    st.markdown(f'<div style="font-size:28px;">📈 Profit: <span style="color:{"green" if Profit>0 else "red"}">${Profit:,.2f}</span></div>', unsafe_allow_html=True)
-with col2:
-    st.header("Stock Info")
-    st.metric(label="💰 Current Price", value=f"${current_price:.2f}")
-    st.metric(label="📊 P/E Ratio (Trailing)", value=f"{pe_ratio:.2f}" if pe_ratio else 'N/A')
-    st.line_chart(ticker.history(period="24mo")["Close"],height=300)
-# Optional: Add a line chart for price history
+# Positions, sheet URL and refresh interval live in positions.toml
+config = positions.load_config()
+
+
+@st.cache_data(ttl=config.refresh_seconds, show_spinner="Refreshing positions sheet and quotes...")
+def refresh_stage(config):
+    # One refresh = the sheet + every quote, however many positions are tracked
+    return positions.refresh(config)
+
+
+@st.fragment(run_every=quotes.QUOTE_INTERVAL)
+def live_price(ticker, reference):
+    # Reruns alone on each quote tick; the sheet and fundamentals stay cached
+    quote = quotes.shared_poller().get(ticker, reference)
+    if quote is None:
+        st.metric(label="💰 Current Price", value='N/A')
+    else:
+        st.metric(label="💰 Current Price", value=f"${quote.price:.2f}", delta=f"{quote.change:+.2f}")
+
+
+if st.button("🔄 Refresh now"):
+    refresh_stage.clear()
+snapshot = refresh_stage(config)
+fetched_at = datetime.datetime.fromtimestamp(snapshot.fetched_at).strftime("%H:%M:%S")
+st.caption(f"Sheet and quotes as of {fetched_at} (refreshed every {config.refresh_seconds // 60} min)")
+
+prices = {ticker: quote.price for ticker, quote in snapshot.quotes.items()}
+with timing.span("compute.portfolio", positions=len(config.positions)):
+    book = portfolio.positions_frame(snapshot.sheet, config.positions, prices)
+    total = portfolio.totals(book)
+
+st.header("📋 Portfolio")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("💰 Position Value", f"${total['value']:,.2f}")
+col2.metric("📈 Profit", f"${total['profit']:,.2f}")
+col3.metric("📊 Margin Requirement", f"${total['margin_requirement']:,.2f}")
+col4.metric("⚠️ Closest Margin Call", f"{total['min_distance_to_call']:+.1%}")
+st.dataframe(
+    book,
+    hide_index=True,
+    column_config={
+        "ticker": "Ticker",
+        "side": "Side",
+        "price": st.column_config.NumberColumn("Price", format="$%.2f"),
+        "cost": st.column_config.NumberColumn("Cost Basis", format="$%.2f"),
+        "value": st.column_config.NumberColumn("Value", format="$%.2f"),
+        "profit": st.column_config.NumberColumn("Profit", format="$%.2f"),
+        "pnl_pct": st.column_config.NumberColumn("P&L %", format="percent"),
+        "margin_rate": st.column_config.NumberColumn("Maint. Margin", format="percent"),
+        "margin_requirement": st.column_config.NumberColumn("Margin Req.", format="$%.2f"),
+        "equity": st.column_config.NumberColumn("Equity", format="$%.2f"),
+        "margin_call_value": st.column_config.NumberColumn("Call at Value", format="$%.2f"),
+        "distance_to_call": st.column_config.NumberColumn("To Margin Call", format="percent"),
+        "exposure": st.column_config.NumberColumn("Exposure", format="$%.2f"),
+        "exposure_pct": st.column_config.NumberColumn("% of Gross", format="percent"),
+    },
+)
+st.caption(f"Net exposure ${total['net_exposure']:,.2f} · gross ${total['gross_exposure']:,.2f} · equity ${total['equity']:,.2f}")
+
+for row, position in zip(book.itertuples(index=False), config.positions):
+    quote = snapshot.quotes[position.ticker]
+
+    st.header(f"{quote.name} ({position.ticker})")
+
+    col1, col2 = st.columns([1, 1])  # center it in col2
+    with col1:
+        st.header(f"{position.side.title()} Position")
+        st.metric("💰 Current Position Value", f"${row.value:,.2f}")
+        st.metric("💰 Cost Basis", f"${row.cost:,.2f}")
+        st.metric("📊 Total Margin", f"${row.margin_requirement:,.2f}")
+        st.markdown(f'<div style="font-size:28px;">📈 Profit: <span style="color:{"green" if row.profit>0 else "red"}">${row.profit:,.2f}</span></div>', unsafe_allow_html=True)
+    with col2:
+        st.header("Stock Info")
+        live_price(position.ticker, quote.price)
+        st.metric(label="📊 P/E Ratio (Trailing)", value=f"{quote.pe_ratio:.2f}" if quote.pe_ratio else 'N/A')
+        with timing.span("render.line_chart", ticker=position.ticker):
+            st.line_chart(quote.closes, height=300)
 
+timing.panel()
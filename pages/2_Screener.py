@@ -0,0 +1,81 @@
+import time
+
+import streamlit as st
+
+import timing
+import universe
+
+st.title("🔎 Screener")
+
+# Every ticker in the local data cache, one row each (see universe.py)
+
+
+@st.cache_data(ttl=universe.MAX_AGE, show_spinner="Loading the fundamentals universe...")
+def universe_stage():
+    return universe.load()
+
+
+if st.button("🔄 Rebuild from cache"):
+    universe.save(universe.build())
+    universe_stage.clear()
+frame = universe_stage()
+if frame.empty:
+    st.info("The data cache is empty: look up some tickers first (or run batch.py on a watchlist).")
+    st.stop()
+st.caption(f"{len(frame):,} cached tickers")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    pe = st.number_input("📊 Exit P/E", value=15.0, min_value=1.0, step=1.0)
+    years = st.slider("🗓️ Projection Years", 1, 10, universe.PROJECTION_YEARS)
+with col2:
+    source = st.selectbox("📈 Net Income Growth", ["revenue_cagr", "ni_cagr", "fixed"], format_func={
+        "revenue_cagr": "Each ticker's revenue CAGR", "ni_cagr": "Each ticker's net income CAGR",
+        "fixed": "One rate for all"}.get)
+    growth = st.number_input("Fixed Growth", value=0.08, step=0.01, format="%.2f") if source == "fixed" else source
+    # Blank = no filter: a bound also drops tickers without the value (e.g. too little history)
+    min_cagr = st.number_input("Min Revenue CAGR (blank = any)", value=None, step=0.05, format="%.2f")
+with col3:
+    min_upside = st.number_input("Min Upside (blank = any)", value=None, step=0.1, format="%.2f")
+    max_pe = st.number_input("Max Trailing P/E (0 = any)", value=0.0, min_value=0.0, step=5.0)
+    top = st.number_input("Top N", value=50, min_value=1, step=10)
+
+sort = st.selectbox("Sort by", ["upside", "implied_growth", "revenue_cagr", "ni_cagr", "net_margin",
+                                "trailing_pe", "market_cap"])
+ascending = st.toggle("Ascending", value=sort in ("implied_growth", "trailing_pe"))
+
+filters = {}
+if min_cagr is not None:
+    filters["revenue_cagr"] = (min_cagr, None)
+if min_upside is not None:
+    filters["upside"] = (min_upside, None)
+if max_pe:
+    filters["trailing_pe"] = (0, max_pe)
+start = time.perf_counter()
+table, matches = universe.screen(frame, filters, sort=sort, ascending=ascending, top=int(top),
+                                 pe=pe, growth=growth, years=years)
+st.caption(f"{matches:,} matches · query {(time.perf_counter() - start) * 1000:.1f} ms")
+
+st.dataframe(
+    table[["ticker", "name", "current_price", "price_target", "upside", "implied_growth", "growth",
+           "revenue_cagr", "ni_cagr", "net_margin", "trailing_pe", "revenue", "net_income", "market_cap"]],
+    hide_index=True,
+    column_config={
+        "ticker": "Ticker",
+        "name": "Name",
+        "current_price": st.column_config.NumberColumn("Price", format="$%.2f"),
+        "price_target": st.column_config.NumberColumn(f"Year-{years} Target", format="$%.2f"),
+        "upside": st.column_config.NumberColumn("Upside", format="percent"),
+        "implied_growth": st.column_config.NumberColumn("Implied NI Growth", format="percent"),
+        "growth": st.column_config.NumberColumn("NI Growth Used", format="percent"),
+        "revenue_cagr": st.column_config.NumberColumn("Revenue CAGR", format="percent"),
+        "ni_cagr": st.column_config.NumberColumn("NI CAGR", format="percent"),
+        "net_margin": st.column_config.NumberColumn("Net Margin", format="percent"),
+        "trailing_pe": st.column_config.NumberColumn("Trailing P/E", format="%.1f"),
+        "revenue": st.column_config.NumberColumn("Revenue ($B)", format="%.2f"),
+        "net_income": st.column_config.NumberColumn("Net Income ($B)", format="%.2f"),
+        "market_cap": st.column_config.NumberColumn("Market Cap", format="$%.3e"),
+    },
+)
+
+timing.panel()
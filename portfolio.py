@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Whole-portfolio P&L and margin maths on one typed DataFrame, one row per
+# position. Every metric is a column expression, so hundreds of positions cost
+# the same few numpy calls as two.
+
+FIELDS = ("profit", "cost", "value")
+
+COLUMNS = {
+    "ticker": "string",
+    "side": "category",
+    "price": "float64",
+    "cost": "float64",
+    "value": "float64",
+    "profit": "float64",
+    "pnl_pct": "float64",
+    "margin_rate": "float64",
+    "margin_requirement": "float64",
+    "equity": "float64",
+    "margin_call_value": "float64",
+    "distance_to_call": "float64",
+    "exposure": "float64",
+    "exposure_pct": "float64",
+}
+
+
+def parse_numbers(raw):
+    # Decimal-comma strings (and blanks) to float64 in one vectorized pass
+    return pd.to_numeric(pd.Series(raw, dtype="string").str.replace(",", ".", regex=False),
+                         errors="coerce").to_numpy(dtype="float64")
+
+
+def positions_frame(sheet, positions, prices=None):
+    """Read every configured position's cells from the sheet in one gather.
+
+    positions are positions.Position entries; prices is an optional
+    {ticker: current price} mapping.
+    """
+    grid = sheet.to_numpy(dtype=object)
+    cells = np.array([[getattr(p, f"{name}_cell") for name in FIELDS] for p in positions],
+                     dtype=np.int64).reshape(len(positions), len(FIELDS), 2)
+    values = parse_numbers(grid[cells[..., 0].ravel(), cells[..., 1].ravel()]).reshape(len(positions), len(FIELDS))
+
+    frame = pd.DataFrame(values, columns=list(FIELDS))
+    frame.insert(0, "ticker", pd.array([p.ticker for p in positions], dtype="string"))
+    frame.insert(1, "side", pd.Categorical([p.side for p in positions], categories=["long", "short"]))
+    frame["price"] = frame["ticker"].map(prices or {}).astype("float64")
+    frame["margin_rate"] = np.array([p.margin_rate for p in positions], dtype="float64")
+    frame["initial_margin"] = np.array([p.initial_margin for p in positions], dtype="float64")
+    return compute(frame)
+
+
+def compute(frame):
+    """Add P&L, margin requirement, distance to a margin call and exposure columns.
+
+    Margin follows the usual Reg T model. A short's collateral is its sale
+    proceeds (cost) plus initial margin; the call comes when equity falls
+    below margin_rate of the current value. A long borrows cost * (1 -
+    initial_margin). distance_to_call is the fractional price move against
+    the position that would trigger the call.
+    """
+    short = (frame["side"] == "short").to_numpy()
+    cost = frame["cost"].to_numpy()
+    value = frame["value"].to_numpy()
+    rate = frame["margin_rate"].to_numpy()
+    initial = frame["initial_margin"].to_numpy()
+
+    collateral = cost * (1 + initial)   # short: proceeds + deposit
+    loan = cost * (1 - initial)         # long: borrowed amount
+    frame["equity"] = np.where(short, collateral - value, value - loan)
+    frame["margin_requirement"] = value * rate
+    frame["margin_call_value"] = np.where(short, collateral / (1 + rate), loan / (1 - rate))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frame["pnl_pct"] = frame["profit"].to_numpy() / cost
+        frame["distance_to_call"] = np.where(short, frame["margin_call_value"].to_numpy() / value - 1,
+                                             1 - frame["margin_call_value"].to_numpy() / value)
+    frame["exposure"] = np.where(short, -value, value)
+    gross = np.nansum(np.abs(frame["exposure"].to_numpy()))
+    frame["exposure_pct"] = np.abs(frame["exposure"]) / gross if gross else np.nan
+    return frame[list(COLUMNS)].astype(COLUMNS)
+
+
+def totals(frame):
+    """Portfolio-level sums plus the tightest margin cushion."""
+    return {
+        "value": frame["value"].sum(),
+        "cost": frame["cost"].sum(),
+        "profit": frame["profit"].sum(),
+        "margin_requirement": frame["margin_requirement"].sum(),
+        "equity": frame["equity"].sum(),
+        "net_exposure": frame["exposure"].sum(),
+        "gross_exposure": frame["exposure"].abs().sum(),
+        "min_distance_to_call": frame["distance_to_call"].min(),
+    }
@@ -0,0 +1,86 @@
+import os
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+import price_store
+import timing
+from data_cache import CachedTicker
+from providers import get_provider
+
+CONFIG_PATH = os.environ.get(
+    "POSITIONS_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "positions.toml"),
+)
+
+
+@dataclass
+class Position:
+    ticker: str
+    profit_cell: tuple
+    cost_cell: tuple
+    value_cell: tuple
+    side: str = "short"
+    margin_rate: float = 0.2     # maintenance margin
+    initial_margin: float = 0.5  # Reg T deposit when the position was opened
+
+
+@dataclass
+class PositionsConfig:
+    sheet_url: str
+    positions: list
+    refresh_seconds: int = 300
+    history_days: int = 730
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path, "rb") as f:
+        raw = tomllib.load(f)
+    positions = [Position(p["ticker"].upper(), tuple(p["profit_cell"]), tuple(p["cost_cell"]),
+                          tuple(p["value_cell"]), p.get("side", "short"), float(p.get("margin_rate", 0.2)),
+                          float(p.get("initial_margin", 0.5)))
+                 for p in raw.get("position", [])]
+    return PositionsConfig(raw["sheet_url"], positions,
+                           int(raw.get("refresh_seconds", 300)), int(raw.get("history_days", 730)))
+
+
+@dataclass
+class Quote:
+    ticker: str
+    name: str = None
+    price: float = None
+    pe_ratio: float = None
+    market_cap: float = None
+    closes: pd.Series = field(default_factory=lambda: pd.Series(dtype=float))
+
+
+def fetch_quote(ticker, history_days=730, provider=None):
+    # info comes through the 15-minute cache; closes from the local price store
+    info = CachedTicker(ticker, provider).info or {}
+    closes = price_store.window(ticker, history_days, provider=provider)
+    price = info.get("currentPrice")
+    if price is None and len(closes):
+        price = float(closes.iloc[-1])
+    return Quote(ticker, info.get("longName"), price, info.get("trailingPE"), info.get("marketCap"), closes)
+
+
+@dataclass
+class PositionsSnapshot:
+    sheet: pd.DataFrame
+    quotes: dict
+    fetched_at: float
+
+
+@timing.timed("fetch.positions")
+def refresh(config, workers=8, provider=None):
+    """Fetch the positions sheet and every quote once, concurrently."""
+    provider = get_provider(provider)
+    tickers = list(dict.fromkeys(p.ticker for p in config.positions))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        sheet = pool.submit(provider.positions_sheet, config.sheet_url)
+        quotes = dict(zip(tickers, pool.map(timing.wrap(lambda t: fetch_quote(t, config.history_days, provider)), tickers)))
+        return PositionsSnapshot(sheet.result(), quotes, time.time())
+
@@ -0,0 +1,211 @@
+import argparse
+import datetime
+import json
+import os
+import threading
+
+import pandas as pd
+
+import timing
+from data_cache import CACHE_DIR, _SAFE_KEY, load, store
+from providers import get_provider
+
+# Local daily-close store, one Parquet file per ticker:
+#   .cache/_prices/<TICKER>.parquet   columns date (date32), close (float32)
+# The file's metadata lists the date ranges already fetched, so a request only
+# downloads the gaps. Days before today are final and kept for good; today's
+# partial bar goes through the regular history TTL cache instead.
+# The store is outside FINANCE_CACHE_MAX_MB and never evicted (a decade of
+# closes is a few KB per ticker); `data_cache.py invalidate` (all kinds or
+# --kind history) deletes a ticker's file so bad ranges get fetched again.
+
+PRICE_DIR = os.environ.get("FINANCE_PRICE_DIR", os.path.join(CACHE_DIR, "_prices"))
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock(ticker):
+    with _locks_guard:
+        return _locks.setdefault(ticker, threading.Lock())
+
+
+def _path(ticker):
+    return os.path.join(PRICE_DIR, f"{_SAFE_KEY.sub('_', ticker.upper())}.parquet")
+
+
+def _day(value):
+    day = pd.Timestamp(value)
+    if day.tzinfo is not None:
+        day = day.tz_localize(None)  # exchange-local date, as Yahoo reports it
+    return day.normalize()
+
+
+def read(ticker):
+    """Stored closes (Series indexed by date) and the covered [start, end] ranges."""
+    import pyarrow.parquet as pq
+    try:
+        table = pq.read_table(_path(ticker))
+    except (OSError, ValueError):
+        return pd.Series(dtype="float32", name="Close", index=pd.DatetimeIndex([], name="Date")), []
+    meta = table.schema.metadata or {}
+    coverage = [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in json.loads(meta.get(b"coverage", b"[]"))]
+    frame = table.to_pandas()
+    closes = pd.Series(frame["close"].to_numpy(), index=pd.DatetimeIndex(frame["date"]), name="Close")
+    return closes, coverage
+
+
+def invalidate(tickers=None):
+    """Delete the stored closes for the given tickers (all if None); returns how many files were removed."""
+    if tickers:
+        names = {_SAFE_KEY.sub("_", t.upper()) for t in tickers}
+    elif os.path.isdir(PRICE_DIR):
+        names = {n[:-len(".parquet")] for n in os.listdir(PRICE_DIR) if n.endswith(".parquet")}
+    else:
+        names = set()
+    removed = 0
+    for ticker in names:
+        with _lock(ticker):
+            try:
+                os.remove(_path(ticker))
+            except FileNotFoundError:
+                continue
+        removed += 1
+    return removed
+
+
+def _merge(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + pd.Timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def gaps(coverage, start, end):
+    """Sub-ranges of [start, end] not covered yet."""
+    missing = []
+    cursor = start
+    for cov_start, cov_end in _merge(coverage):
+        if cov_end < cursor:
+            continue
+        if cov_start > end:
+            break
+        if cov_start > cursor:
+            missing.append((cursor, cov_start - pd.Timedelta(days=1)))
+        cursor = max(cursor, cov_end + pd.Timedelta(days=1))
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+def write(ticker, closes, coverage):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    closes = closes[~closes.index.duplicated(keep="last")].sort_index()
+    table = pa.table({"date": pa.array(closes.index.date, pa.date32()),
+                      "close": pa.array(closes.to_numpy(), pa.float32())})
+    coverage = [(s.date().isoformat(), e.date().isoformat()) for s, e in _merge(coverage)]
+    table = table.replace_schema_metadata({"coverage": json.dumps(coverage)})
+    path = _path(ticker)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def append(ticker, closes, start, end):
+    """Merge closes for [start, end] into the store and mark the range covered."""
+    with _lock(ticker.upper()):
+        stored, coverage = read(ticker)
+        closes = closes.copy()
+        closes.index = pd.DatetimeIndex([_day(d) for d in closes.index])
+        merged = pd.concat([stored, closes.astype("float32")]) if len(stored) else closes.astype("float32")
+        write(ticker, merged, coverage + [(_day(start), _day(end))])
+
+
+def closes(ticker, start, end=None, provider=None, today=None):
+    """Daily closes for [start, end] (inclusive), fetching only the missing ranges.
+
+    Missing ranges come from provider.history(); a provider that isn't
+    cacheable (fixture replay) is read directly and never written to the store.
+    """
+    provider = get_provider(provider)
+    ticker = ticker.upper()
+    today = _day(today or datetime.date.today())
+    start = _day(start)
+    end = _day(end) if end is not None else today
+    with timing.span("fetch.history", ticker=ticker) as span:
+        if not provider.cacheable:
+            span.set(cache="bypass")
+            series = provider.history(ticker, start, end)
+            series.index = pd.DatetimeIndex([_day(d) for d in series.index])
+            return series.astype(float)
+        final_end = min(end, today - pd.Timedelta(days=1))
+        fetched_bytes = 0
+        misses = 0
+
+        if start <= final_end:
+            _, coverage = read(ticker)
+            for gap_start, gap_end in gaps(coverage, start, final_end):
+                fetched = provider.history(ticker, gap_start, gap_end)
+                misses += 1
+                fetched_bytes += int(fetched.memory_usage(index=True))
+                # An empty answer for more than a long weekend is more likely a failed
+                # request than a range without trading, so don't mark it covered
+                if len(fetched) or (gap_end - gap_start).days < 5:
+                    append(ticker, fetched, gap_start, gap_end)
+
+        stored, _ = read(ticker)
+        series = stored.loc[start:final_end].astype(float)
+        if end >= today:
+            # Today's bar is still moving: short-lived pickle cache, never the store
+            # (an empty answer is kept too: no bar yet on weekends and holidays)
+            key = f"close={today.date()}"
+            recent = load(ticker, "history", key)
+            if recent is None:
+                recent = provider.history(ticker, today, today)
+                misses += 1
+                fetched_bytes += store(ticker, "history", recent, key)
+            if len(recent):
+                recent = recent.copy()
+                recent.index = pd.DatetimeIndex([_day(d) for d in recent.index])
+                series = pd.concat([series, recent.astype(float).loc[today:end]])
+        span.set(cache="miss" if misses else "hit", bytes=fetched_bytes, requests=misses)
+    return series
+
+
+def window(ticker, days, today=None, provider=None):
+    # Trailing window, e.g. window("PLTR", 730) for ~24 months
+    today = _day(today or datetime.date.today())
+    return closes(ticker, today - pd.Timedelta(days=days), today, provider=provider, today=today)
+
+
+def year_end_closes(ticker, start_year, end_year, provider=None, today=None):
+    """Last close of each year, indexed by year-end Timestamp like resample('YE')."""
+    series = closes(ticker, f"{start_year}-01-01", f"{end_year}-12-31", provider=provider, today=today)
+    return series.resample("YE").last()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the local daily-close store.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to show (default: all)")
+    args = parser.parse_args()
+
+    names = args.tickers
+    if not names and os.path.isdir(PRICE_DIR):
+        names = sorted(n[:-len(".parquet")] for n in os.listdir(PRICE_DIR) if n.endswith(".parquet"))
+    total = 0
+    for ticker in names:
+        stored, coverage = read(ticker)
+        size = os.path.getsize(_path(ticker)) if os.path.exists(_path(ticker)) else 0
+        total += size
+        ranges = ", ".join(f"{s.date()}→{e.date()}" for s, e in coverage) or "empty"
+        print(f"📈 {ticker}: {len(stored)} closes, {size / 1024:.1f} KB, covers {ranges}")
+    print(f"📦 {len(names)} tickers, {total / 1024 / 1024:.1f} MB in {PRICE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import numpy as np
+
+# Default windows shared by all front-ends
+HISTORY_YEARS = 4
+PROJECTION_YEARS = 4
+
+
+def project_paths(start_values, growth_rates, years=PROJECTION_YEARS):
+    """Compound every start value at its growth rate for years 1..N in one call.
+
+    start_values, growth_rates and years broadcast against each other, so any of
+    them can be a scalar or an array (e.g. one row per ticker or per scenario).
+    Returns an array of shape broadcast_shape + (max(years),); paths with a
+    shorter horizon than the longest one are padded with NaN.
+    """
+    start = np.asarray(start_values, dtype=float)
+    growth = np.asarray(growth_rates, dtype=float)
+    horizons = np.asarray(years, dtype=int)
+    max_years = int(horizons.max()) if horizons.size else 0
+    steps = np.arange(1, max_years + 1)
+
+    shape = np.broadcast_shapes(start.shape, growth.shape, horizons.shape)
+    start = np.broadcast_to(start, shape)[..., None]
+    growth = np.broadcast_to(growth, shape)[..., None]
+    paths = start * np.power(1 + growth, steps)
+
+    if horizons.ndim and (horizons != max_years).any():
+        paths = np.where(steps <= np.broadcast_to(horizons, shape)[..., None], paths, np.nan)
+    return paths
+
+
+def project_growth(values, growth_rate, years=PROJECTION_YEARS):
+    if len(values) == 0:
+        return []
+    return project_paths(values[-1], growth_rate, years).tolist()
+
+
+def price_targets(net_income, shares_outstanding, pe):
+    # (net income / shares) * P/E, broadcasting like project_paths
+    return np.asarray(net_income, dtype=float) / np.asarray(shares_outstanding, dtype=float) * np.asarray(pe, dtype=float)
+
+
+def implied_growth(current_price, net_income, shares_outstanding, pe, years=PROJECTION_YEARS):
+    """Net income growth rate at which the year-N price target equals current_price.
+
+    Inverts price_targets(project_paths(net_income, g, years)[-1], shares, pe)
+    in closed form, g = (price * shares / (pe * net_income))^(1/years) - 1,
+    broadcasting over all inputs. NaN where net income is not positive or an
+    input is missing, since no growth rate compounds a loss into a price.
+    """
+    price = np.asarray(current_price, dtype=float)
+    net_income = np.asarray(net_income, dtype=float)
+    required = price * np.asarray(shares_outstanding, dtype=float) / (np.asarray(pe, dtype=float) * net_income)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.power(required, 1 / np.asarray(years, dtype=float)) - 1
+    return np.where((net_income > 0) & (required > 0), growth, np.nan)
+
+
+def scenario_grid(net_income, shares_outstanding, growth_rates, pe_values,
+                  years=PROJECTION_YEARS, current_price=None):
+    """Year-N price target over the full growth x P/E grid in one broadcast.
+
+    Returns (targets, upside), both shaped (len(growth_rates), len(pe_values)).
+    upside is target / current_price - 1, or all-NaN without a current price.
+    """
+    growth = np.asarray(growth_rates, dtype=float)[:, None]
+    pe = np.asarray(pe_values, dtype=float)[None, :]
+    eps_n = net_income * np.power(1 + growth, years) / shares_outstanding
+    targets = eps_n * pe
+    if current_price:
+        upside = targets / current_price - 1
+    else:
+        upside = np.full_like(targets, np.nan)
+    return targets, upside
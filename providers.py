@@ -0,0 +1,208 @@
+import hashlib
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+# Where market data comes from. Every front-end takes a provider (default:
+# the one named by FINANCE_PROVIDER):
+#   yahoo          live yfinance (default)
+#   record[:DIR]   yahoo, plus every response saved under DIR (default fixtures/)
+#   replay[:DIR]   serve the saved responses only: no network, no latency
+# The on-disk cache and price store sit on top of the yahoo provider; record
+# and replay bypass them so fixtures are complete and never mix with live data.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class DataProvider:
+    """Interface: annual / quarterly financials (DataFrame), info (dict), daily closes and the positions sheet."""
+
+    name = "base"
+    cacheable = True  # let data_cache / price_store keep local copies
+
+    def financials(self, ticker):
+        raise NotImplementedError
+
+    def quarterly_financials(self, ticker):
+        """Same layout as financials(), one column per quarter (the last few quarters)."""
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+    def history(self, ticker, start, end):
+        """Daily closes (Series) for the inclusive date range [start, end]."""
+        raise NotImplementedError
+
+    def positions_sheet(self, url):
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    name = "yahoo"
+
+    def financials(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).financials
+
+    def quarterly_financials(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).quarterly_financials
+
+    def info(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+    def history(self, ticker, start, end):
+        import yfinance as yf
+        # yfinance's end is exclusive
+        hist = yf.Ticker(ticker).history(start=pd.Timestamp(start).date().isoformat(),
+                                         end=(pd.Timestamp(end) + pd.Timedelta(days=1)).date().isoformat())
+        if hist is None or "Close" not in hist:
+            return pd.Series(dtype=float)
+        return hist["Close"].dropna()
+
+    def positions_sheet(self, url):
+        return pd.read_csv(url)
+
+
+def _sheet_key(url):
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+class _Fixtures:
+    # <dir>/<TICKER>/{financials,quarterly_financials,info,history}.pkl and <dir>/_sheets/<url hash>.pkl
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, ticker, kind):
+        return os.path.join(self.root, ticker.upper(), f"{kind}.pkl")
+
+    def load(self, path):
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def save(self, path, value):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+class RecordingProvider(DataProvider):
+    """Passes calls through to another provider and snapshots every response."""
+
+    name = "record"
+    cacheable = False  # always hit the inner provider so the fixtures are complete
+
+    def __init__(self, inner=None, root=FIXTURES_DIR):
+        self.inner = inner or YahooProvider()
+        self.fixtures = _Fixtures(root)
+        self.lock = threading.Lock()
+
+    def financials(self, ticker):
+        value = self.inner.financials(ticker)
+        self.fixtures.save(self.fixtures.path(ticker, "financials"), value)
+        return value
+
+    def quarterly_financials(self, ticker):
+        value = self.inner.quarterly_financials(ticker)
+        path = self.fixtures.path(ticker, "quarterly_financials")
+        with self.lock:
+            # Yahoo only returns the last few quarters: keep every one seen so far
+            recorded = self.fixtures.load(path)
+            merged = value if recorded is None else value.combine_first(recorded)
+            self.fixtures.save(path, merged[sorted(merged.columns, reverse=True)])
+        return value
+
+    def info(self, ticker):
+        value = self.inner.info(ticker)
+        self.fixtures.save(self.fixtures.path(ticker, "info"), dict(value or {}))
+        return value
+
+    def history(self, ticker, start, end):
+        value = self.inner.history(ticker, start, end)
+        path = self.fixtures.path(ticker, "history")
+        with self.lock:
+            # One merged series per ticker, so replay can serve any window inside it
+            recorded = self.fixtures.load(path)
+            merged = value if recorded is None else pd.concat([recorded, value])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self.fixtures.save(path, merged)
+        return value
+
+    def positions_sheet(self, url):
+        value = self.inner.positions_sheet(url)
+        self.fixtures.save(os.path.join(self.fixtures.root, "_sheets", f"{_sheet_key(url)}.pkl"), value)
+        return value
+
+
+class ReplayProvider(DataProvider):
+    """Serves recorded fixtures; anything not recorded comes back empty, like an unknown ticker."""
+
+    name = "replay"
+    cacheable = False
+
+    def __init__(self, root=FIXTURES_DIR):
+        self.fixtures = _Fixtures(root)
+
+    def financials(self, ticker):
+        value = self.fixtures.load(self.fixtures.path(ticker, "financials"))
+        return pd.DataFrame() if value is None else value
+
+    def quarterly_financials(self, ticker):
+        value = self.fixtures.load(self.fixtures.path(ticker, "quarterly_financials"))
+        return pd.DataFrame() if value is None else value
+
+    def info(self, ticker):
+        return self.fixtures.load(self.fixtures.path(ticker, "info")) or {}
+
+    def history(self, ticker, start, end):
+        closes = self.fixtures.load(self.fixtures.path(ticker, "history"))
+        if closes is None or closes.empty:
+            return pd.Series(dtype=float)
+        days = closes.index.tz_localize(None).normalize() if closes.index.tz is not None else closes.index.normalize()
+        return closes[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+
+    def positions_sheet(self, url):
+        value = self.fixtures.load(os.path.join(self.fixtures.root, "_sheets", f"{_sheet_key(url)}.pkl"))
+        if value is None:
+            raise FileNotFoundError(f"no recorded positions sheet for {url}")
+        return value
+
+
+def make_provider(spec):
+    """Build a provider from a FINANCE_PROVIDER-style spec, e.g. 'replay:fixtures'."""
+    name, _, root = spec.partition(":")
+    root = root or FIXTURES_DIR
+    if name == "yahoo":
+        return YahooProvider()
+    if name == "record":
+        return RecordingProvider(YahooProvider(), root)
+    if name == "replay":
+        return ReplayProvider(root)
+    raise ValueError(f"unknown provider {spec!r} (use yahoo, record[:DIR] or replay[:DIR])")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_provider(provider=None):
+    """provider if given (an instance or a spec string), else the FINANCE_PROVIDER default."""
+    global _default
+    if isinstance(provider, str):
+        return make_provider(provider)
+    if provider is not None:
+        return provider
+    with _default_lock:
+        if _default is None:
+            _default = make_provider(os.environ.get("FINANCE_PROVIDER", "yahoo"))
+        return _default
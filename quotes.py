@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+# Background last-price poller shared by the Streamlit pages.
+#   QUOTE_SOURCE=yahoo|simulated   (simulated needs no network)
+#   QUOTE_INTERVAL=<seconds>       how often watched tickers are refreshed
+# Only last prices are polled; fundamentals stay in the regular caches.
+
+QUOTE_SOURCE = os.environ.get("QUOTE_SOURCE", "yahoo")
+QUOTE_INTERVAL = float(os.environ.get("QUOTE_INTERVAL", "15"))
+IDLE_AFTER = 5  # intervals without a reader before a ticker stops being polled
+
+
+@dataclass
+class LiveQuote:
+    ticker: str
+    price: float
+    previous: float
+    updated_at: float
+
+    @property
+    def change(self):
+        return self.price - self.previous if self.previous else 0.0
+
+
+class YahooQuotes:
+    """Last trade prices from yfinance's lightweight fast_info.
+
+    Yahoo has no multi-symbol last-price call, so a poll makes one small
+    request per watched ticker (yf.Tickers only shares the session).
+    """
+
+    def fetch(self, tickers, reference):
+        import yfinance as yf
+        batch = yf.Tickers(" ".join(tickers))
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker] = float(batch.tickers[ticker].fast_info["lastPrice"])
+            except Exception:
+                continue  # keep the last good price for this ticker
+        return prices
+
+
+class SimulatedQuotes:
+    """Seeded geometric random walk starting from each ticker's reference price."""
+
+    def __init__(self, seed=0, volatility=0.002):
+        self.rng = np.random.default_rng(seed)
+        self.volatility = volatility
+        self.prices = {}
+        self.lock = threading.Lock()  # the poller thread and first reads in sessions both fetch
+
+    def fetch(self, tickers, reference):
+        with self.lock:
+            steps = np.exp(self.rng.normal(0, self.volatility, len(tickers)))
+            for ticker, step in zip(tickers, steps):
+                start = self.prices.get(ticker, reference.get(ticker) or 100.0)
+                self.prices[ticker] = start * step
+            return {ticker: self.prices[ticker] for ticker in tickers}
+
+
+def make_source(name=QUOTE_SOURCE):
+    if name == "simulated":
+        return SimulatedQuotes()
+    if name == "yahoo":
+        return YahooQuotes()
+    raise ValueError(f"unknown quote source {name!r} (use 'yahoo' or 'simulated')")
+
+
+class QuotePoller(threading.Thread):
+    """Refreshes last prices for the tickers currently being read.
+
+    get() registers a ticker (with a reference price, e.g. info's
+    currentPrice, used as a fallback and as the simulation's start); the
+    thread then polls every watched ticker once per interval until nobody
+    has asked for it for IDLE_AFTER intervals.
+    """
+
+    def __init__(self, source=None, interval=QUOTE_INTERVAL):
+        super().__init__(daemon=True)
+        self.source = source or make_source()
+        self.interval = interval
+        self.quotes = {}
+        self.watched = {}    # ticker -> last time a reader asked for it
+        self.reference = {}  # ticker -> fallback price
+        self.lock = threading.Lock()
+
+    def get(self, ticker, reference=None):
+        ticker = ticker.upper()
+        with self.lock:
+            self.watched[ticker] = time.monotonic()
+            if reference is not None:
+                self.reference.setdefault(ticker, reference)
+            quote = self.quotes.get(ticker)
+        if quote is None:
+            self.poll([ticker])  # first read: don't wait for the next tick
+            with self.lock:
+                quote = self.quotes.get(ticker)
+        return quote
+
+    def poll(self, tickers):
+        with self.lock:
+            reference = {t: self.reference.get(t) for t in tickers}
+        try:
+            prices = self.source.fetch(tickers, reference)
+        except Exception:
+            prices = {}
+        now = time.time()
+        with self.lock:
+            for ticker in tickers:
+                price = prices.get(ticker)
+                if price is None:
+                    if ticker in self.quotes or reference.get(ticker) is None:
+                        continue  # keep the last good price
+                    price = reference[ticker]
+                previous = self.quotes[ticker].price if ticker in self.quotes else reference.get(ticker)
+                self.quotes[ticker] = LiveQuote(ticker, price, previous, now)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            cutoff = time.monotonic() - IDLE_AFTER * self.interval
+            with self.lock:
+                for ticker in [t for t, seen in self.watched.items() if seen < cutoff]:
+                    del self.watched[ticker]
+                tickers = list(self.watched)
+            if tickers:
+                self.poll(tickers)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_poller():
+    """The process-wide poller (started on first use), shared by all pages and sessions."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = QuotePoller()
+            _shared.start()
+        return _shared
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import sys
+import time
+
+from projection import HISTORY_YEARS, PROJECTION_YEARS
+
+# Headless chart rendering for a whole watchlist: one Agg figure per ticker,
+# spread over a process pool (matplotlib rendering holds the GIL, so threads
+# don't help). Workers are recycled every MAX_TASKS_PER_CHILD tickers so
+# fragmentation and matplotlib's caches can't grow a worker without bound.
+# multiprocessing.Pool rather than ProcessPoolExecutor: the latter's
+# max_tasks_per_child can deadlock when it replaces a worker on Python 3.11.
+
+FORMATS = ("png", "svg")
+MAX_TASKS_PER_CHILD = 100
+
+
+def _init_worker():
+    os.environ["MPLBACKEND"] = "Agg"
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)  # bytes on macOS, KB on Linux
+
+
+def render_ticker(ticker, assumptions, out_dir, fmt="png", dpi=150,
+                  history_years=HISTORY_YEARS, projection_years=PROJECTION_YEARS, provider=None, use_ttm=False):
+    """Fetch, project and render one ticker's chart to <out_dir>/<TICKER>.<fmt>.
+
+    Returns (path, size in bytes, worker pid, worker peak RSS in MB).
+    """
+    import charts
+    from Projections_Console import ProjectionError, chart_spec
+    from snapshot import load_snapshot
+
+    snapshot = load_snapshot(ticker, history_years, provider=provider)
+    ttm = None
+    if use_ttm:
+        from ttm import load_ttm
+        ttm = load_ttm(ticker, provider)
+    spec = chart_spec(ticker, snapshot, history_years=history_years, projection_years=projection_years, ttm=ttm,
+                      **assumptions)
+    if spec is None:
+        raise ProjectionError("not enough financial data or shares outstanding")
+    image = charts.to_image(spec, fmt, dpi=dpi)
+    path = os.path.join(out_dir, f"{ticker}.{fmt}")
+    with open(path, "wb") as f:
+        f.write(image)
+    return path, len(image), os.getpid(), _peak_rss_mb()
+
+
+def _render_entry(job):
+    # Pool worker: errors come back as values so one bad ticker doesn't stop the map
+    ticker, assumptions, *args = job
+    try:
+        return ticker, render_ticker(ticker, assumptions, *args), None
+    except Exception as e:
+        return ticker, None, str(e)
+
+
+def render_watchlist(entries, out_dir, fmt="png", dpi=150, workers=None, max_tasks_per_child=MAX_TASKS_PER_CHILD,
+                     history_years=HISTORY_YEARS, projection_years=PROJECTION_YEARS, provider=None, progress=print,
+                     use_ttm=False):
+    """Render every (ticker, assumptions) entry on a process pool.
+
+    provider must be picklable (a spec string such as 'replay:fixtures', or
+    None for FINANCE_PROVIDER). Returns a summary dict: rendered count,
+    failures as [(ticker, error)], wall time and peak RSS per worker pid.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r} (use {' or '.join(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    jobs = [(ticker, assumptions, out_dir, fmt, dpi, history_years, projection_years, provider, use_ttm)
+            for ticker, assumptions in entries]
+    start = time.perf_counter()
+    rendered, failures, peak_rss = 0, [], {}
+    with multiprocessing.Pool(workers, initializer=_init_worker, maxtasksperchild=max_tasks_per_child) as pool:
+        for ticker, result, error in pool.imap_unordered(_render_entry, jobs):
+            if error is not None:
+                failures.append((ticker, error))
+            else:
+                rendered += 1
+                _, _, pid, rss = result
+                peak_rss[pid] = max(peak_rss.get(pid) or 0, rss or 0)
+            done = rendered + len(failures)
+            if progress and done % 100 == 0:
+                progress(f"… {done}/{len(jobs)} charts done")
+    return {"rendered": rendered, "failures": failures, "seconds": time.perf_counter() - start,
+            "peak_rss_mb": peak_rss}
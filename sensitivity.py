@@ -0,0 +1,52 @@
+import numpy as np
+
+from projection import PROJECTION_YEARS
+
+# Sensitivity of the year-N price target
+#   P = ni_last * (1 + g)^n / shares * pe
+# to each of its inputs, in closed form. Everything broadcasts, so one call
+# covers any number of tickers (or scenarios) with no re-projection.
+
+INPUTS = ("net_income", "growth", "shares", "pe")
+LABELS = {"net_income": "Base Net Income", "growth": "Net Income Growth", "shares": "Shares Outstanding",
+          "pe": "P/E Multiple"}
+
+
+def price_target(net_income, growth, shares, pe, years=PROJECTION_YEARS):
+    return (np.asarray(net_income, dtype=float) * np.power(1 + np.asarray(growth, dtype=float), years)
+            / np.asarray(shares, dtype=float) * np.asarray(pe, dtype=float))
+
+
+def elasticities(growth, years=PROJECTION_YEARS):
+    """d ln P / d ln x for every input, shape broadcast(growth, years) + (len(INPUTS),).
+
+    Net income and P/E enter linearly (1), shares inversely (-1) and growth
+    through the compounding term: n * g / (1 + g).
+    """
+    growth = np.asarray(growth, dtype=float)
+    g_elasticity = np.asarray(years) * growth / (1 + growth)
+    ones = np.ones_like(g_elasticity)
+    return np.stack([ones, g_elasticity, -ones, ones], axis=-1)
+
+
+def bumps(net_income, growth, shares, pe, bump=0.1, years=PROJECTION_YEARS):
+    """Price target and the exact effect of a ±bump relative change in each input.
+
+    Returns a dict of arrays, the last axis following INPUTS:
+      price       base price target, shape (...)
+      elasticity  d ln P / d ln x, shape (..., 4)
+      low, high   price target with the input scaled by (1 - bump) / (1 + bump)
+    """
+    price = price_target(net_income, growth, shares, pe, years)
+    growth = np.asarray(growth, dtype=float)
+    down, up = 1 - bump, 1 + bump
+    # Relative price change per input, from the closed form rather than a re-projection
+    growth_ratio = lambda scale: np.power((1 + growth * scale) / (1 + growth), years)
+    low = np.stack(np.broadcast_arrays(down, growth_ratio(down), 1 / down, down), axis=-1)
+    high = np.stack(np.broadcast_arrays(up, growth_ratio(up), 1 / up, up), axis=-1)
+    return {
+        "price": price,
+        "elasticity": elasticities(growth, years) * np.ones_like(price)[..., None],
+        "low": price[..., None] * low,
+        "high": price[..., None] * high,
+    }
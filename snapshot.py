@@ -0,0 +1,94 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+import timing
+from data_cache import CachedTicker
+from projection import HISTORY_YEARS
+
+
+def normalize_financials(financials):
+    """Revenue and net income in billions, oldest first, over the years that report both; empty Series if either is missing."""
+    financials = financials.T  # years as rows
+    try:
+        # Charts plot both lines on the same years, so a year missing either value is dropped
+        both = financials[['Total Revenue', 'Net Income']].dropna().sort_index() / 1e9
+    except KeyError:
+        return pd.Series(dtype=float), pd.Series(dtype=float)
+    return both['Total Revenue'], both['Net Income']
+
+
+def yearly_closes(closes, start_year, end_year):
+    # Year-end close per year, indexed by the year as a string
+    closes = closes[(closes.index.year >= start_year) & (closes.index.year <= end_year)]
+    yearly = closes.resample('YE').last()
+    yearly.index = yearly.index.year.astype(str)
+    return yearly
+
+
+@dataclass
+class TickerSnapshot:
+    ticker: str
+    revenue: pd.Series
+    net_income: pd.Series
+    info: dict = field(default_factory=dict)
+    closes: pd.Series = field(default_factory=lambda: pd.Series(dtype=float))
+
+    @property
+    def has_financials(self):
+        return not (self.revenue.empty or self.net_income.empty)
+
+    @property
+    def shares_outstanding(self):
+        # billions
+        shares = self.info.get("sharesOutstanding", None)
+        return shares / 1e9 if shares is not None else None
+
+    @property
+    def eps_ttm(self):
+        return self.info.get("trailingEps", None)
+
+    @property
+    def current_price(self):
+        return self.info.get("currentPrice", None)
+
+    def yearly_prices(self, start_year, end_year):
+        if self.closes.empty:
+            return pd.Series(dtype=float)
+        return yearly_closes(self.closes, start_year, end_year)
+
+
+def history_window(history_years=HISTORY_YEARS, today=None):
+    # One extra year on the left because the latest fiscal year may not be closed yet
+    year = (today or datetime.date.today()).year
+    return f"{year - history_years - 1}-01-01", f"{year}-12-31"
+
+
+def load_snapshot(ticker, history_years=HISTORY_YEARS, pool=None, provider=None):
+    """Fetch financials, info and price history for one ticker concurrently.
+
+    The three requests are independent, so time-to-data is the slowest of
+    them rather than their sum. info is read once and kept as a plain dict;
+    closes come from the local price store, which only fetches missing days.
+    provider is a providers.DataProvider or spec string (default: FINANCE_PROVIDER).
+    """
+    stock = CachedTicker(ticker, provider)
+    start, end = history_window(history_years)
+
+    own_pool = pool is None
+    pool = pool or ThreadPoolExecutor(max_workers=3)
+    try:
+        with timing.span("fetch.snapshot", ticker=stock.ticker):
+            financials = pool.submit(timing.wrap(lambda: stock.financials))
+            info = pool.submit(timing.wrap(lambda: stock.info))
+            history = pool.submit(timing.wrap(stock.closes), start, end)
+            financials, info, closes = financials.result(), dict(info.result() or {}), history.result()
+        with timing.span("compute.normalize", ticker=stock.ticker):
+            revenue, net_income = normalize_financials(financials)
+    finally:
+        if own_pool:
+            pool.shutdown(wait=False)
+
+    return TickerSnapshot(stock.ticker, revenue, net_income, info, closes)
@@ -0,0 +1,212 @@
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Lightweight timing spans for fetch / compute / render stages.
+#   FINANCE_TIMING=1           record spans (off by default: span() is a no-op)
+#   FINANCE_TIMING_LOG=<path>  where the JSON-lines log goes (default: stderr)
+# Every finished span is logged as one JSON object and kept in a ring buffer
+# of recent spans that the Streamlit diagnostics panel and report() summarize.
+#
+#   with timing.run("app"):                    # groups the spans of one rerun
+#       with timing.span("fetch.info", ticker="AAPL") as s:
+#           s.set(cache="hit", bytes=1234)
+
+RECENT_SPANS = 5000
+
+logger = logging.getLogger("finance.timing")
+recent = deque(maxlen=RECENT_SPANS)
+
+_enabled = os.environ.get("FINANCE_TIMING", "0").lower() not in ("", "0", "false", "no")
+_run = contextvars.ContextVar("timing_run", default=None)
+_run_ids = itertools.count(1)
+_log_lock = threading.Lock()
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Span:
+    __slots__ = ("stage", "fields", "start")
+
+    def __init__(self, stage, fields):
+        self.stage = stage
+        self.fields = fields
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        record = {"stage": self.stage, "ms": round(ms, 3), "run": _run.get(), "at": time.time(), **self.fields}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        recent.append(record)
+        _log(record)
+        return False
+
+
+def _log(record):
+    if not logger.handlers:
+        with _log_lock:
+            if not logger.handlers:
+                path = os.environ.get("FINANCE_TIMING_LOG")
+                handler = logging.FileHandler(path) if path else logging.StreamHandler(sys.stderr)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+    logger.info(json.dumps(record, default=str))
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def span(stage, **fields):
+    """Context manager timing one stage; .set() adds fields such as cache='hit' or bytes."""
+    if not _enabled:
+        return _NO_SPAN
+    return Span(stage, fields)
+
+
+class run:
+    """Tag every span in this block (and in threads started via wrap()) with one run id."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if not _enabled:
+            self.token = None
+            return _NO_SPAN
+        self.token = _run.set(f"{self.name}-{next(_run_ids)}")
+        self.span = Span(f"{self.name}.run", {})
+        return self.span.__enter__()
+
+    def __exit__(self, *exc):
+        if self.token is None:
+            return False
+        self.span.__exit__(*exc)
+        _run.reset(self.token)
+        return False
+
+
+def timed(stage):
+    """Decorator form of span(); the wrapped call is timed as one stage."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(stage, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def wrap(fn):
+    # Carry the current run id into a worker thread: pool.submit(timing.wrap(fn), ...)
+    if not _enabled:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def spans(stage_prefix=None):
+    return [r for r in list(recent) if stage_prefix is None or r["stage"].startswith(stage_prefix)]
+
+
+def summary(records=None):
+    """Per-stage count, p50/p95/max latency (ms), cache hits/misses and bytes."""
+    stages = {}
+    for record in spans() if records is None else records:
+        stages.setdefault(record["stage"], []).append(record)
+    rows = []
+    for stage, group in sorted(stages.items()):
+        ms = sorted(r["ms"] for r in group)
+        rows.append({
+            "stage": stage,
+            "count": len(ms),
+            "p50_ms": ms[len(ms) // 2],
+            "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+            "max_ms": ms[-1],
+            "hits": sum(r.get("cache") == "hit" for r in group),
+            "misses": sum(r.get("cache") == "miss" for r in group),
+            "bytes": sum(r.get("bytes", 0) for r in group),
+        })
+    return rows
+
+
+def report(file=None):
+    """Print summary() as a table (used by the command-line front-ends on exit)."""
+    if not _enabled or not recent:
+        return
+    file = file or sys.stderr
+    print(f"\n⏱️ {'stage':<28} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'hit/miss':>9} {'KB':>9}",
+          file=file)
+    for row in summary():
+        cache = f"{row['hits']}/{row['misses']}" if row["hits"] or row["misses"] else ""
+        print(f"   {row['stage']:<28} {row['count']:>5} {row['p50_ms']:>10.2f} {row['p95_ms']:>10.2f} "
+              f"{row['max_ms']:>10.2f} {cache:>9} {row['bytes'] / 1024:>9.1f}", file=file)
+
+
+def panel(title="🩺 Diagnostics"):
+    """Collapsible Streamlit panel: per-stage summary and latency histograms of recent spans."""
+    import altair as alt
+    import pandas as pd
+    import streamlit as st
+
+    with st.expander(title):
+        on = st.toggle("Record stage timings", value=_enabled, key="timing_enabled")
+        if on != _enabled:
+            enable(on)  # process-wide, like FINANCE_TIMING
+        records = spans()
+        if not records:
+            st.caption("No spans recorded yet: enable timings (or set FINANCE_TIMING=1) and rerun.")
+            return
+        frame = pd.DataFrame(records)
+        runs = frame["run"].dropna().nunique()
+        st.caption(f"{len(frame)} spans from {runs} recent runs (last {RECENT_SPANS} spans kept)")
+        st.dataframe(pd.DataFrame(summary(records)), hide_index=True, column_config={
+            "p50_ms": st.column_config.NumberColumn("p50 ms", format="%.2f"),
+            "p95_ms": st.column_config.NumberColumn("p95 ms", format="%.2f"),
+            "max_ms": st.column_config.NumberColumn("max ms", format="%.2f"),
+        })
+        histograms = alt.Chart(frame[["stage", "ms"]]).mark_bar().encode(
+            x=alt.X("ms:Q", bin=alt.Bin(maxbins=30), title="latency (ms)"),
+            y=alt.Y("count():Q", title="spans"),
+            row=alt.Row("stage:N", title=None, header=alt.Header(labelAngle=0, labelAlign="left")),
+        ).properties(height=50).resolve_scale(x="independent", y="independent")
+        st.altair_chart(histograms)
+        if st.button("Clear timings"):
+            recent.clear()
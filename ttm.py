@@ -0,0 +1,133 @@
+import argparse
+from collections import deque
+
+import pandas as pd
+
+import data_cache
+import timing
+from providers import get_provider
+
+# Trailing-twelve-month revenue and net income from quarterly statements.
+# The rolling window keeps the last four quarters and their running sums, so
+# a new quarter is one add and one drop instead of a re-sum of the series.
+# The window lives in the data cache (kind "quarterly"): once it is stale, a
+# refresh is one quarterly_financials() call, and only quarters newer than the
+# window are pushed.
+#   .cache/<TICKER>/quarterly.pkl
+
+QUARTERS = 4
+MAX_QUARTER_GAP = pd.Timedelta(days=120)  # further apart means a quarter is missing
+
+
+def quarters(financials):
+    """Quarterly revenue and net income in billions, oldest first; quarters missing either are dropped."""
+    try:
+        frame = financials.T[["Total Revenue", "Net Income"]].dropna() / 1e9
+    except KeyError:
+        return pd.DataFrame(columns=["revenue", "net_income"], dtype=float)
+    frame.columns = ["revenue", "net_income"]
+    frame.index = pd.DatetimeIndex(frame.index)
+    return frame.sort_index()
+
+
+class RollingTTM:
+    """Running sums over the last four quarters, updated one quarter at a time."""
+
+    def __init__(self, window=(), revenue=0.0, net_income=0.0, history=()):
+        self.window = deque(window, maxlen=QUARTERS)  # (period end, revenue, net income)
+        self.revenue = revenue
+        self.net_income = net_income
+        self.history = list(history)  # (period end, TTM revenue, TTM net income) per full window
+
+    @property
+    def ready(self):
+        return len(self.window) == QUARTERS
+
+    @property
+    def period_end(self):
+        return self.window[-1][0] if self.window else None
+
+    @property
+    def label(self):
+        # Chart axis label for the current point, e.g. "TTM Mar 2025"
+        return f"TTM {self.period_end:%b %Y}" if self.window else "TTM"
+
+    def push(self, period_end, revenue, net_income):
+        """Add the next quarter, dropping the oldest; False if it isn't newer than the last one."""
+        period_end = pd.Timestamp(period_end)
+        last = self.period_end
+        if last is not None and period_end <= last:
+            return False
+        if last is not None and period_end - last > MAX_QUARTER_GAP:
+            # Never sum across a missing quarter: start a new window
+            self.window.clear()
+            self.revenue = self.net_income = 0.0
+        if self.ready:
+            _, old_revenue, old_net_income = self.window[0]  # append() below drops it
+            self.revenue -= old_revenue
+            self.net_income -= old_net_income
+        revenue, net_income = float(revenue), float(net_income)
+        self.window.append((period_end, revenue, net_income))
+        self.revenue += revenue
+        self.net_income += net_income
+        if self.ready:
+            self.history.append((period_end, self.revenue, self.net_income))
+        return True
+
+    def extend(self, frame):
+        """Push the rows of a quarters() frame in order; returns how many were new."""
+        return sum(self.push(*row) for row in zip(frame.index, frame["revenue"], frame["net_income"]))
+
+    def series(self):
+        """TTM revenue and net income (billions) at every quarter end with a full window."""
+        frame = pd.DataFrame(self.history, columns=["period_end", "revenue", "net_income"])
+        return frame.set_index("period_end")
+
+    def to_dict(self):
+        # Plain data for the cache, so stored windows don't depend on this class
+        return {"window": list(self.window), "revenue": self.revenue, "net_income": self.net_income,
+                "history": self.history}
+
+
+def load_ttm(ticker, provider=None):
+    """Rolling TTM for ticker; a stale cache entry is brought up to date with one quarterly fetch."""
+    provider = get_provider(provider)
+    ticker = ticker.upper()
+    with timing.span("fetch.quarterly", ticker=ticker) as span:
+        if not provider.cacheable:
+            span.set(cache="bypass")
+            state = RollingTTM()
+            state.extend(quarters(provider.quarterly_financials(ticker)))
+            return state
+        stored = data_cache.load(ticker, "quarterly")
+        if stored is not None:
+            span.set(cache="hit")
+            return RollingTTM(**stored)
+        # Stale or missing: keep the stored window, whatever its age, and push only what's new
+        state = RollingTTM(**(data_cache.load(ticker, "quarterly", ttl=float("inf")) or {}))
+        fetched = quarters(provider.quarterly_financials(ticker))
+        added = state.extend(fetched)
+        span.set(cache="miss", quarters=added)
+        # Don't pin a failed or empty response for a whole TTL
+        if len(fetched):
+            span.set(bytes=data_cache.store(ticker, "quarterly", state.to_dict()))
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show trailing-twelve-month revenue and net income.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--provider", help="yahoo, record[:DIR] or replay[:DIR] (default: $FINANCE_PROVIDER or yahoo)")
+    args = parser.parse_args()
+
+    for ticker in args.tickers:
+        state = load_ttm(ticker, args.provider)
+        if not state.ready:
+            print(f"⚠️ {ticker.upper()}: fewer than {QUARTERS} consecutive quarters reported")
+            continue
+        print(f"\n📅 {ticker.upper()} TTM (Billions), latest quarter ending {state.period_end.date()}:")
+        print(state.series().round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import timing
+from projection import PROJECTION_YEARS, implied_growth, price_targets
+from snapshot import normalize_financials
+
+# Cross-sectional fundamentals table built from the local data cache (no
+# network): one row per cached ticker, one column per field, kept as a
+# Parquet snapshot next to the cache so later loads skip the pickles:
+#   .cache/_universe.parquet
+# Screens are column masks over the whole table, so a query over thousands
+# of tickers costs milliseconds. Revenue / net income are in billions.
+
+UNIVERSE_PATH = os.path.join(data_cache.CACHE_DIR, "_universe.parquet")
+MAX_AGE = 3600  # seconds before load() rebuilds the snapshot from the cache
+CAGR_YEARS = 3
+
+COLUMNS = ["ticker", "name", "last_year", "revenue", "net_income", "revenue_cagr", "ni_cagr", "net_margin",
+           "shares_outstanding", "eps_ttm", "current_price", "trailing_pe", "market_cap"]
+
+
+def _cagr(series, years):
+    # Compound annual growth over the last `years` intervals (fewer if that's all there is)
+    if len(series) < 2:
+        return np.nan
+    years = min(years, len(series) - 1)
+    start, end = float(series.iloc[-1 - years]), float(series.iloc[-1])
+    if start <= 0 or end <= 0:
+        return np.nan
+    return (end / start) ** (1 / years) - 1
+
+
+def _row(ticker, financials, info, cagr_years):
+    revenue, net_income = normalize_financials(financials) if financials is not None else (pd.Series(dtype=float),) * 2
+    shares = info.get("sharesOutstanding")
+    last_revenue = float(revenue.iloc[-1]) if len(revenue) else np.nan
+    last_ni = float(net_income.iloc[-1]) if len(net_income) else np.nan
+    return {
+        "ticker": ticker,
+        "name": info.get("longName"),
+        "last_year": int(revenue.index[-1].year) if len(revenue) else None,
+        "revenue": last_revenue,
+        "net_income": last_ni,
+        "revenue_cagr": _cagr(revenue, cagr_years),
+        "ni_cagr": _cagr(net_income, cagr_years),
+        "net_margin": last_ni / last_revenue if last_revenue else np.nan,
+        "shares_outstanding": shares / 1e9 if shares else np.nan,
+        "eps_ttm": info.get("trailingEps"),
+        "current_price": info.get("currentPrice"),
+        "trailing_pe": info.get("trailingPE"),
+        "market_cap": info.get("marketCap"),
+    }
+
+
+def build(tickers=None, cagr_years=CAGR_YEARS):
+    """Read every cached ticker's financials and info (whatever their age) into one DataFrame."""
+    rows = []
+    with timing.span("universe.build") as span:
+        for ticker in tickers or data_cache.tickers():
+            financials = data_cache.load(ticker, "financials", ttl=float("inf"))
+            info = data_cache.load(ticker, "info", ttl=float("inf")) or {}
+            if financials is None and not info:
+                continue
+            rows.append(_row(ticker, financials, info, cagr_years))
+        span.set(tickers=len(rows))
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    numeric = [c for c in COLUMNS if c not in ("ticker", "name", "last_year")]
+    frame[numeric] = frame[numeric].astype("float64")
+    frame["last_year"] = frame["last_year"].astype("Int64")
+    return frame
+
+
+def save(frame, path=UNIVERSE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    frame.to_parquet(tmp, index=False, compression="zstd")
+    os.replace(tmp, path)
+
+
+def load(max_age=MAX_AGE, path=UNIVERSE_PATH):
+    """The universe table: the Parquet snapshot if younger than max_age, else rebuilt and saved."""
+    try:
+        if time.time() - os.path.getmtime(path) <= max_age:
+            return pd.read_parquet(path)
+    except OSError:
+        pass
+    frame = build()
+    save(frame, path)
+    return frame
+
+
+def project(frame, pe=15.0, growth="revenue_cagr", years=PROJECTION_YEARS):
+    """Add year-N projections to every row in one broadcast.
+
+    growth is a rate for all tickers or the name of a column (each ticker's
+    own revenue_cagr by default, i.e. constant margins). Adds projected_ni,
+    price_target, upside versus current_price and the implied_growth that
+    today's price assumes at this P/E.
+    """
+    g = frame[growth].to_numpy(dtype=float) if isinstance(growth, str) else np.full(len(frame), float(growth))
+    net_income = frame["net_income"].to_numpy(dtype=float)
+    shares = frame["shares_outstanding"].to_numpy(dtype=float)
+    price = frame["current_price"].to_numpy(dtype=float)
+    projected_ni = net_income * np.power(1 + g, years)
+    target = price_targets(projected_ni, shares, pe)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        upside = target / price - 1
+    return frame.assign(growth=g, projected_ni=projected_ni, price_target=target, upside=upside,
+                        implied_growth=implied_growth(price, net_income, shares, pe, years))
+
+
+def screen(frame, filters=None, sort="upside", ascending=False, top=50,
+           pe=15.0, growth="revenue_cagr", years=PROJECTION_YEARS):
+    """Filter, rank and cut the universe, with projections at the given P/E and growth.
+
+    filters maps a column (any of COLUMNS or project()'s) to (min, max);
+    either bound may be None. Rows with NaN in a filtered column are dropped.
+    Returns (top rows, number of matching rows), e.g.
+        screen(load(), {"revenue_cagr": (0.10, None), "upside": (0.30, None)}, pe=15)
+    """
+    with timing.span("universe.screen", rows=len(frame)) as span:
+        table = project(frame, pe, growth, years)
+        mask = np.ones(len(table), dtype=bool)
+        for column, (low, high) in (filters or {}).items():
+            values = table[column].to_numpy(dtype=float)
+            mask &= ~np.isnan(values)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        table = table[mask]
+        if top:
+            table = table.nsmallest(top, sort) if ascending else table.nlargest(top, sort)
+        else:
+            table = table.sort_values(sort, ascending=ascending)
+        span.set(matches=int(mask.sum()))
+    return table.reset_index(drop=True), int(mask.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the fundamentals universe from the local cache.")
+    parser.add_argument("tickers", nargs="*", help="Only these tickers (default: every cached ticker)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frame = build([t.upper() for t in args.tickers] or None)
+    save(frame)
+    print(f"🌐 {len(frame)} tickers in {time.perf_counter() - start:.1f}s → '{UNIVERSE_PATH}'")
+
+
+if __name__ == "__main__":
+    main()